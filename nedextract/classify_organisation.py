@@ -2,6 +2,7 @@
 
 - Read the required input data into a dataframe
 - train a classifier model
+- load a pretrained classifier model
 - predict the sector using input text and a pretrained classifier model.
 
 Copyright 2022 Netherlands eScience Center
@@ -13,6 +14,7 @@ import argparse
 import os
 from argparse import RawTextHelpFormatter
 from datetime import datetime
+from functools import lru_cache
 import pandas as pd
 from joblib import dump
 from joblib import load
@@ -114,13 +116,34 @@ def train(data: pd.DataFrame, train_size: float, alpha: float, save: bool = Fals
     return clf, label
 
 
+@lru_cache(maxsize=4)
+def load_classifier(saved_clf: str, saved_labels: str, saved_vector: str, modified: tuple = None):  # pylint: disable=unused-argument
+    """Load a trained classifier, its label encoding and its TF-IDF vectorizer from the saved files.
+
+    The loaded objects are cached, so that the files are read only once per process when the sectors of many texts
+    are predicted. The cache is keyed on the file paths and 'modified', the modification times of the files, so that
+    files that are saved again (e.g. by 'train') are read again.
+
+    Args:
+        saved_clf (str): The file path to the saved pre-trained classifier (joblib file).
+        saved_labels (str): The file path to the saved label encoding for sectors (joblib file).
+        saved_vector (str): The file path to the saved TF-IDF vectorizer (joblib file).
+        modified (tuple, optional): The modification times of the three files.
+
+    Returns:
+        tuple: The classifier, the label encoding and the TF-IDF vectorizer.
+    """
+    return load(saved_clf), load(saved_labels), load(saved_vector)
+
+
 def predict_main_sector(saved_clf: str, saved_labels: str, saved_vector: str, text: str):
     """Predict the main sector category for a given text using a trained classifier.
 
     This function predicts the main sector category for a given text using a pre-trained
     Multinomial Naive Bayes classifier (which can be created using the function 'train').
     It loads the classifier, label encoding for sectors, and the TF-IDF vectorizer from the saved files
-    ('saved_clf', 'saved_labels', and 'saved_vector') and then processes the input 'text' to predict its main sector.
+    ('saved_clf', 'saved_labels', and 'saved_vector'), or reuses them if they were already loaded by
+    'load_classifier', and then processes the input 'text' to predict its main sector.
 
     Args:
         saved_clf (str): The file path to the saved pre-trained classifier (joblib file).
@@ -131,9 +154,8 @@ def predict_main_sector(saved_clf: str, saved_labels: str, saved_vector: str, te
     Returns:
         str: The predicted main sector category for the input text.
     """
-    clf = load(saved_clf)
-    labels = load(saved_labels)
-    tf_idf = load(saved_vector)
+    modified = tuple(os.path.getmtime(saved) for saved in (saved_clf, saved_labels, saved_vector))
+    clf, labels, tf_idf = load_classifier(saved_clf, saved_labels, saved_vector, modified)
     text_tf = tf_idf.transform([text])
     predicted = clf.predict(text_tf)
     predicted_class = labels[predicted]
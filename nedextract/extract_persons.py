@@ -16,12 +16,22 @@ Functions:
 """
 
 import re
+from collections import namedtuple
 import numpy as np
 from .utils.determinejobs import DetermineJobs
 from .utils.keywords import JobKeywords
 from .utils.nameanalysis import NameAnalysis
 
 
+# all job keywords in a single pattern, used to find sentences that mention a job
+JOB_KEYWORDS = re.compile(r"\b(?:" + '|'.join(JobKeywords.main_job_all + JobKeywords.sub_job_all) + r")\b")
+PUNCTUATION = re.compile('[.,]')
+
+# potential director: name, sub_cat, ft_director, backup main_cat, backup_sub_cat, fts_bestuur, fts_rvt
+PotDirector = namedtuple('PotDirector', ['member', 'sub_cat', 'ft_director', 'backup_main_cat', 'backup_sub_cat',
+                                         'fts_bestuur', 'fts_rvt'])
+
+
 def identify_potential_people(doc, all_persons: list):
     """Identify potential ambassadors and board members based on keywords in sentences.
 
@@ -39,28 +49,30 @@ def identify_potential_people(doc, all_persons: list):
               potentially significant people, and the inner lists contain various ways of
               writing the names of the same individual.
     """
-    pot_per = np.array([])  # people with potential significant position
+    pot_per = []  # people with potential significant position
     people = []  # list of all writing forms of names of people in pot_per
 
     # Identify people with potential predefined jobs
     for sentence in doc.sentences:
-        stripped_sentence = sentence.text.lower().replace(',', ' ').replace('.', ' ')
-        if any(re.search(r"\b" + item + r"\b", stripped_sentence)
-               for item in (JobKeywords.main_job_all + JobKeywords.sub_job_all)):
-            pot_per = np.append(pot_per,
-                                [f'{ent.text}' for ent in sentence.ents if ent.type == "PER"])
-
-    # postprocessing of identified pot_per
-    for pp in pot_per:
+        stripped_sentence = PUNCTUATION.sub(' ', sentence.text.lower())
+        if JOB_KEYWORDS.search(stripped_sentence):
+            pot_per.extend([f'{ent.text}' for ent in sentence.ents if ent.type == "PER"])
+
+    # postprocessing of identified pot_per, once for each unique name
+    job_words = set(JobKeywords.main_job_all + JobKeywords.sub_job_all)
+    unique_pot_per = set(pot_per)
+    pot_per = set()
+    for pp in unique_pot_per:
         # Remove search words identified as persons
-        if pp.lower() in (JobKeywords.main_job_all + JobKeywords.sub_job_all):
-            pot_per = pot_per[pot_per != pp]
-        # Remove photographers identified as pot_per
-        if re.search(r"©[ ]?" + pp + r"\b", doc.text):
-            pot_per = pot_per[pot_per != pp]
+        if pp.lower() in job_words:
+            continue
         # check if length of name is not one
         if len(pp) == 1:
-            pot_per = pot_per[pot_per != pp]
+            continue
+        # Remove photographers identified as pot_per
+        if re.search(r"©[ ]?" + re.escape(pp) + r"\b", doc.text):
+            continue
+        pot_per.add(pp)
 
     # Find duplicates (i.e. J Brown and James Brown) and concatenate all ways of writing
     # the name of one persons that is potentially of interest
@@ -117,7 +129,7 @@ def extract_persons(doc, all_persons: list):
                - Array of potential 'Controlecommissie' members and their sub positions.
     """
     # Define variables
-    b_position = np.array([])   # to be filled with strings of the form 'name - main pos - sub_ pot'
+    b_position = []   # to be filled with strings of the form 'name - main pos - sub_ pot'
 
     # list of potential directors: name, sub_cat, ft_director, main_cat, backup_sub_cat,fts_bestuur,fts_rvt
     pot_director = []
@@ -130,11 +142,14 @@ def extract_persons(doc, all_persons: list):
     # identify people to be analysed
     people = identify_potential_people(doc, all_persons)
 
+    # (lowercased) texts of all sentences, shared by all people
+    sentence_texts = [(sentence.text, sentence.text.lower()) for sentence in doc.sentences]
+
     for members in people:
         # Determine relevant sentences, main and sub job category, and select main name from synonyms
         member = members[0]
-        jobsdetermination = DetermineJobs(members=members, doc=doc,
-                                          main_jobs=JobKeywords.main_jobs, p_position=p_position)
+        jobsdetermination = DetermineJobs(members=members, doc=doc, main_jobs=JobKeywords.main_jobs,
+                                          p_position=p_position, sentence_texts=sentence_texts)
         m_ft_dbr = jobsdetermination.determine_main_job()
         jobsdetermination.main_jobs = m_ft_dbr[0]
         sub_cat = jobsdetermination.determine_sub_job()
@@ -151,7 +166,7 @@ def extract_persons(doc, all_persons: list):
         if m_ft_dbr[0] != 'ambassadeur':
             if m_ft_dbr[0] is None:
                 continue
-            b_position = np.append(b_position, member + ' - ' + m_ft_dbr[0] + ' - ' + sub_cat[0])
+            b_position.append(member + ' - ' + m_ft_dbr[0] + ' - ' + sub_cat[0])
             if m_ft_dbr[0] == 'directeur':
                 if sub_cat[0] == '':
                     jobsdetermination.main_jobs = JobKeywords.main_jobs_backup
@@ -159,8 +174,8 @@ def extract_persons(doc, all_persons: list):
                 else:
                     jobsdetermination.main_jobs = JobKeywords.main_jobs_backup_noamb
                     m_ft_dbr[0] = jobsdetermination.determine_main_job()[0]
-                pot_director.append([member, sub_cat[0], m_ft_dbr[1], m_ft_dbr[0], sub_cat[1],
-                                     m_ft_dbr[2], m_ft_dbr[3]])
+                pot_director.append(PotDirector(member, sub_cat[0], m_ft_dbr[1], m_ft_dbr[0], sub_cat[1],
+                                                m_ft_dbr[2], m_ft_dbr[3]))
             elif m_ft_dbr[0] == 'rvt':
                 pot_rvt.append([member, sub_cat[0], m_ft_dbr[3]])
             elif m_ft_dbr[0] == 'bestuur':
@@ -169,23 +184,20 @@ def extract_persons(doc, all_persons: list):
                 p_position = append_p_position(p_position, m_ft_dbr[0], member)
 
     # Additional checks for potential directeur position
-    pot_director = np.array(pot_director, dtype=object)
     if len(pot_director) > 1:
         (b_position, pot_rvt, pot_bestuur, p_position) = \
             director_check(pot_director, b_position, pot_rvt, pot_bestuur, p_position)
     elif len(pot_director) == 1:
-        p_position = append_p_position(p_position, 'directeur', pot_director[0][0])
+        p_position = append_p_position(p_position, 'directeur', pot_director[0].member)
 
     # Determine if people initially identified as rvt memeber are likely true rvt members
-    pot_rvt = np.array(pot_rvt, dtype=object)
     b_position, p_position = check_rvt(pot_rvt, b_position, p_position)
 
     # Determine if people initially identified as bestuur memeber are likely true bestuur members
-    pot_bestuur = np.array(pot_bestuur, dtype=object)
     b_position, p_position = check_bestuur(pot_bestuur, b_position, p_position)
 
     return (array_p_position(p_position, 'ambassadeur'),
-            b_position,
+            np.array(b_position),
             array_p_position(p_position, 'directeur'),
             array_p_position(p_position, 'rvt'),
             array_p_position(p_position, 'bestuur'),
@@ -194,8 +206,8 @@ def extract_persons(doc, all_persons: list):
             array_p_position(p_position, 'controlecommissie'))
 
 
-def director_check(pot_director: np.array, b_position: np.array,
-                   pot_rvt: np.array, pot_bestuur: np.array, p_position: list):
+def director_check(pot_director: list, b_position: list,  # pylint: disable=too-many-locals
+                   pot_rvt: list, pot_bestuur: list, p_position: list):
     """Check potential directors and update their positions if necessary.
 
     A potential director is not considered a director if either:
@@ -214,60 +226,60 @@ def director_check(pot_director: np.array, b_position: np.array,
     Otherwise, add the pot_director to p_position.
 
     Args:
-        pot_director (numpy.array): An array of potential directors and associated information.
-        b_position (np.array): An array in which each element has the form 'name - main position - sub position'.
-        pot_rvt (np.array of lists): An array of lists containing potential 'rvt' (Raad van Toezicht) members.
+        pot_director (list of PotDirector): A list of potential directors and associated information.
+        b_position (list): A list in which each element has the form 'name - main position - sub position'.
+        pot_rvt (list of lists): A list of lists containing potential 'rvt' (Raad van Toezicht) members.
                         Each list contains the name of the person, the associated 'rvt' position,
                         and the count of 'rvt' positions held by that person.
-        pot_bestuur (np.array of lists): An array of lists containing potential bestuur members.
+        pot_bestuur (list of lists): A list of lists containing potential bestuur members.
                         Each list contains the name of the person, the associated bestuur position,
                         and the count of bestuur positions held by that person.
         p_position (list): List of position categories and associated names.
 
     Returns:
         tuple: A tuple containing the following updated arrays/lists:
-               - Array of people with significant positions + main and sub positions.
+               - List of people with significant positions + main and sub positions.
                - List of potential 'Raad van Toezicht' (rvt) members and their sub positions.
                - List of potential board members and their sub positions.
                - List of position categories and associated names.
     """
+    # Determine the highest director term frequency once, and collect the changes to b_position
+    max_ft = max(pot_dir[2] for pot_dir in pot_director)
+    b_position_remove = set()
+    b_position_add = []
+
     # Loop through potential directors
-    for i in range(len(pot_director)):
-        if (all([len(pot_director) > 5, pot_director[i, 2] <= 3,
-                pot_director[:, 2].max() > 5]) or
-                all([pot_director[i, 2] <= 1, pot_director[:, 2].max() > 2]) or
-                (pot_director[i, 1] != 'directeur')):
+    for member, sub_cat, ft_director, backup_main_cat, backup_sub_cat, fts_bestuur, fts_rvt in pot_director:
+        if (all([len(pot_director) > 5, ft_director <= 3, max_ft > 5]) or
+                all([ft_director <= 1, max_ft > 2]) or
+                (sub_cat != 'directeur')):
 
             # if condition is met remove from b_position
-            b_position = b_position[b_position != (pot_director[i, 0] + ' - directeur - ' +
-                                                   pot_director[i, 1])]
+            b_position_remove.add(member + ' - directeur - ' + sub_cat)
 
             # Use backup main cat instad of directeur function and update pot_rvt/pot_bestuur/p_position accordingly
-            if str(pot_director[i, 3]) == 'rvt':
-                pot_rvt.append([pot_director[i, 0],
-                                pot_director[i, 4],
-                                pot_director[i, 6]])
-            elif str(pot_director[i, 3]) == 'bestuur':
-                pot_bestuur.append([pot_director[i, 0],
-                                    pot_director[i, 4],
-                                    pot_director[i, 5]])
-            elif str(pot_director[i, 3]) in JobKeywords.main_job:
-                p_position = append_p_position(p_position, str(pot_director[i, 3]),
-                                               pot_director[i, 0])
+            if str(backup_main_cat) == 'rvt':
+                pot_rvt.append([member, backup_sub_cat, fts_rvt])
+            elif str(backup_main_cat) == 'bestuur':
+                pot_bestuur.append([member, backup_sub_cat, fts_bestuur])
+            elif str(backup_main_cat) in JobKeywords.main_job:
+                p_position = append_p_position(p_position, str(backup_main_cat), member)
 
             # Specifiy subposition, but not if the main is abassadeur or None
-            if pot_director[i, 3] != 'ambassadeur' and pot_director[i, 3] is not None:
-                subf = str(pot_director[i, 4])
+            if backup_main_cat != 'ambassadeur' and backup_main_cat is not None:
+                subf = str(backup_sub_cat)
                 # Update b_position according to backup
-                b_position = np.append(b_position, (str(pot_director[i, 0]) + ' - ' +
-                                       str(pot_director[i, 3]) + ' - ' + subf))
+                b_position_add.append(str(member) + ' - ' + str(backup_main_cat) + ' - ' + subf)
         else:
             # if condition is not met add directeur to p_position
-            p_position = append_p_position(p_position, 'directeur', pot_director[i, 0])
+            p_position = append_p_position(p_position, 'directeur', member)
+
+    # Update b_position in one go
+    b_position = [bp for bp in b_position if bp not in b_position_remove] + b_position_add
     return b_position, pot_rvt, pot_bestuur, p_position
 
 
-def check_rvt(pot_rvt: np.array, b_position: np.array, p_position: list):
+def check_rvt(pot_rvt: list, b_position: list, p_position: list):
     """Determine whether potential rvt memebers can be considered true rvt memebers.
 
     This function determines whether potential rvt members ('pot_rvt') can be considered true rvt memebers,
@@ -282,31 +294,33 @@ def check_rvt(pot_rvt: np.array, b_position: np.array, p_position: list):
     3. Otherwise, add the pot_rvt member to p_position
 
     Args:
-        pot_rvt (np.array of lists): An array of lists containing potential 'rvt' (Raad van Toezicht) members.
+        pot_rvt (list of lists): A list of lists containing potential 'rvt' (Raad van Toezicht) members.
                         Each list contains the name of the person, the associated 'rvt' position,
                         and the count of 'rvt' positions held by that person.
-        b_position (np.array): An array in which each element has the form 'name - main position - sub position'.
+        b_position (list): A list in which each element has the form 'name - main position - sub position'.
         p_position (list of lists): A list of sublists, each of which contains a main job category and
         names of people for that job if any.
 
     Returns:
         tuple: A tuple containing two elements:
-               - Updated b_positions (numpy.ndarray) after removing certain 'rvt' members based on
+               - Updated b_positions (list) after removing certain 'rvt' members based on
                  the specified conditions.
                - Updated p_position categories and associated names after adding any 'rvt' positions
                  that meet the conditions.
     """
-    for rvt in enumerate(pot_rvt):
-        if len(pot_rvt) >= 12 and rvt[1][2] <= 3:
-            b_position = b_position[b_position != rvt[1][0] + ' - rvt - ' + rvt[1][1]]
-        elif len(pot_rvt) >= 8 and rvt[1][2] == 1:
-            b_position = b_position[b_position != rvt[1][0] + ' - rvt - ' + rvt[1][1]]
+    b_position_remove = set()
+    for member, sub_cat, fts_rvt in pot_rvt:
+        if len(pot_rvt) >= 12 and fts_rvt <= 3:
+            b_position_remove.add(member + ' - rvt - ' + sub_cat)
+        elif len(pot_rvt) >= 8 and fts_rvt == 1:
+            b_position_remove.add(member + ' - rvt - ' + sub_cat)
         else:
-            p_position = append_p_position(p_position, 'rvt', rvt[1][0])
+            p_position = append_p_position(p_position, 'rvt', member)
+    b_position = [bp for bp in b_position if bp not in b_position_remove]
     return b_position, p_position
 
 
-def check_bestuur(pot_bestuur: np.array, b_position: np.array, p_position: list):
+def check_bestuur(pot_bestuur: list, b_position: list, p_position: list):
     """Determine whether potential bestuur memebers can be considered true bestuur memebers.
 
     This function determines whether potential bestuur members ('pot_bestuur') can be considered true bestuur members,
@@ -321,29 +335,29 @@ def check_bestuur(pot_bestuur: np.array, b_position: np.array, p_position: list)
     3. Otherwise, add the pot_bestuur member to p_position
 
     Args:
-        pot_bestuur (np.array of lists): An array of lists containing potential bestuur members.
+        pot_bestuur (list of lists): A list of lists containing potential bestuur members.
                         Each list contains the name of the person, the associated bestuur position,
                         and the count of bestuur positions held by that person.
-        b_position (np.ndarray): An array in which each element has the form 'name - main position - sub position'.
+        b_position (list): A list in which each element has the form 'name - main position - sub position'.
         p_position (list of lists): A list of sublists, each of which contains a main job category and
         names of people for that job if any.
 
     Returns:
         tuple: A tuple containing two elements:
-               - Updated b_positions (numpy.ndarray) after removing certain bestuur members based on
+               - Updated b_positions (list) after removing certain bestuur members based on
                  the specified conditions.
                - Updated p_position categories and associated names after adding any bestuur positions
                  that meet the conditions.
     """
-    for bestuur in enumerate(pot_bestuur):
-        if len(pot_bestuur) >= 12 and bestuur[1][2] <= 3:
-            b_position = b_position[b_position != (bestuur[1][0] + ' - bestuur - ' +
-                                                   bestuur[1][1])]
-        elif len(pot_bestuur) >= 8 and bestuur[1][2] == 1:
-            b_position = b_position[b_position != (bestuur[1][0] + ' - bestuur - ' +
-                                                   bestuur[1][1])]
+    b_position_remove = set()
+    for member, sub_cat, fts_bestuur in pot_bestuur:
+        if len(pot_bestuur) >= 12 and fts_bestuur <= 3:
+            b_position_remove.add(member + ' - bestuur - ' + sub_cat)
+        elif len(pot_bestuur) >= 8 and fts_bestuur == 1:
+            b_position_remove.add(member + ' - bestuur - ' + sub_cat)
         else:
-            p_position = append_p_position(p_position, 'bestuur', bestuur[1][0])
+            p_position = append_p_position(p_position, 'bestuur', member)
+    b_position = [bp for bp in b_position if bp not in b_position_remove]
     return b_position, p_position
 
 
@@ -3,19 +3,22 @@
 Functions:
 - collect_orgs
 - decide_org
+- individual_check_needed
 - match_anbis
 - apply_matching
+- matching_lookup
 """
 
+from collections import Counter
 import numpy as np
 import pandas as pd
 import stanza
-from .preprocessing import preprocess_pdf
+from .preprocessing import process_pdf_variants
 from .utils.keywords import Org_Keywords
 from .utils.orgs_checks import OrganisationExtraction
 
 
-def collect_orgs(infile: str, nlp: stanza.Pipeline):  # pylint: disable=too-many-locals'
+def collect_orgs(infile: str, nlp: stanza.Pipeline, cache_dir: str = None):  # pylint: disable=too-many-locals'
     """Extract mentioned organisations from a PDF document.
 
     This function is used to extract mentioned organisations (ORGs) in a text using Stanza NER.
@@ -26,7 +29,8 @@ def collect_orgs(infile: str, nlp: stanza.Pipeline):  # pylint: disable=too-many
     Steps:
     1. preprocess the text in three different ways, as it is often unclear what the best way of 'reading'
        consequetive blacks lines, replacesent of end-of-line characters, or parentheses is, and gather for each way
-       NER entities defined as ORG.
+       NER entities defined as ORG. The three preprocessed texts are processed by NER in a single bulk call, or read
+       from the cache directory if they were processed before.
     2. determine the unique entities mentioned as candidates.
     3. Determine which candidates are considered 'true' organisations based on:
        - whether is contains a typical orginastions keyword.
@@ -37,6 +41,8 @@ def collect_orgs(infile: str, nlp: stanza.Pipeline):  # pylint: disable=too-many
     Args:
         infile (str): Path to the input PDF file.
         nlp (stanza.Pipeline): The stanza language model used for text processing.
+        cache_dir (str, optional): The directory in which the NER processed texts are cached. Defaults to None, in which
+            case nothing is cached.
 
     Returns:
         list: A sorted list of filtered organizational entities extracted from the PDF document.
@@ -45,54 +51,82 @@ def collect_orgs(infile: str, nlp: stanza.Pipeline):  # pylint: disable=too-many
     single_orgs = []
     extraction = OrganisationExtraction()
 
+    # preprocessing methods 1, 2 and 3, processed by NER in one batch
+    doc_c, doc_p, doc_pp = process_pdf_variants(infile, nlp, [{'r_blankline': ', ', 'r_par': ', '},
+                                                              {'r_blankline': '. ', 'r_par': ', '},
+                                                              {'r_blankline': '. ', 'r_eol': '. ', 'r_par': ', '}],
+                                                cache_dir)
+
     # preprocessing method 1
-    doc_c = nlp(preprocess_pdf(infile, r_blankline=', ', r_par=', '))
-    org_c = np.unique([ent.text.rstrip('.') for ent in doc_c.ents if ent.type == "ORG"],
-                      return_counts=True)
+    org_c = Counter(ent.text.rstrip('.') for ent in doc_c.ents if ent.type == "ORG")
 
     # Preprocessing method 2
-    doc_p = nlp(preprocess_pdf(infile, r_blankline='. ', r_par=', '))
-    org_p = np.unique([ent.text.rstrip('.') for ent in doc_p.ents if ent.type == "ORG"],
-                      return_counts=True)
+    org_p = Counter(ent.text.rstrip('.') for ent in doc_p.ents if ent.type == "ORG")
 
     # Preprocessing method 3
-    doc_pp = nlp(preprocess_pdf(infile, r_blankline='. ', r_eol='. ', r_par=', '))
-    org_pp = np.unique([ent.text.rstrip('.') for ent in doc_pp.ents if ent.type == "ORG"])
+    org_pp = {ent.text.rstrip('.') for ent in doc_pp.ents if ent.type == "ORG"}
 
     # determine unique orgs candidates based on all 'forms' of entities gathered with the different preprocessing steps
-    org_all = np.unique(np.concatenate((org_c[0], org_p[0], org_pp)))
-
-    # steps to dertermine 'true' orgs
-    for org in org_all:
-        extraction.org = org
-        if any(kw in org.lower() for kw in Org_Keywords.search_strip):
-            n_org = extraction.strip_function_of_entity()
-        else:
-            n_org = org
-        if n_org != org and len(n_org) >= 3:
-            single_orgs.append(n_org)
-        else:
+    org_all = sorted(org_c.keys() | org_p.keys() | org_pp)
+
+    try:
+        # strip the function of entities, orgs that are not stripped are decided on based on their mentions
+        stripped_orgs = {}
+        for org in org_all:
+            extraction.org = org
+            lower_org = org.lower()
+            if any(kw in lower_org for kw in Org_Keywords.search_strip):
+                stripped_orgs[org] = extraction.strip_function_of_entity()
+            else:
+                stripped_orgs[org] = org
+        decide_orgs = [org for org in org_all if not (stripped_orgs[org] != org and len(stripped_orgs[org]) >= 3)]
+
+        # orgs with a 'false' keyword never pass the keyword check, which is required for any 'true' org, so
+        # they are not decided on at all
+        false_orgs = {org for org in decide_orgs if OrganisationExtraction.false_keyword_check(org)}
+        decide_orgs = [org for org in decide_orgs if org not in false_orgs]
+
+        # count the mentions of all orgs to be decided on at once
+        mentions_c = dict(zip(decide_orgs, OrganisationExtraction.count_all_mentions(decide_orgs, doc_c)))
+        mentions_p = dict(zip(decide_orgs, OrganisationExtraction.count_all_mentions(decide_orgs, doc_p)))
+
+        # determine the percentage of mentions in which the orgs to be decided on were found as org
+        pcos = {}
+        for org in decide_orgs:
+            extraction.org = org
             extraction.doc = doc_c
-            extraction.orgs = org_c[0]
-            extraction.counts = org_c[1]
-            pco_c = extraction.percentage_considered_org()
+            extraction.orgs = org_c
+            pco_c = extraction.percentage_considered_org(n_orgs=mentions_c[org])
             extraction.doc = doc_p
-            extraction.orgs = org_p[0]
-            extraction.counts = org_p[1]
-            pco_p = extraction.percentage_considered_org()
-            pco = pco_c, pco_p
-            decision = decide_org(org, pco, org_pp, org_c, nlp)
-
-            # process conclusion
-            if decision is True:
-                true_orgs.append(org)
-            elif decision == 'maybe':
-                single_orgs.append(org)
-    for org in single_orgs:
-        extraction.org = org
-        extraction.true_orgs = true_orgs
-        extraction.doc = doc_c
-        true_orgs = extraction.check_single_orgs()
+            extraction.orgs = org_p
+            pco_p = extraction.percentage_considered_org(n_orgs=mentions_p[org])
+            pcos[org] = pco_c, pco_p
+
+        # apply NER to all standalone orgs needed by the decision tree in one batch
+        OrganisationExtraction.bulk_ner_orgs(nlp, [org for org in decide_orgs
+                                                   if individual_check_needed(org, pcos[org], org_pp, org_c)])
+
+        # steps to dertermine 'true' orgs
+        for org in org_all:
+            n_org = stripped_orgs[org]
+            if n_org != org and len(n_org) >= 3:
+                single_orgs.append(n_org)
+            elif org not in false_orgs:
+                decision = decide_org(org, pcos[org], org_pp, org_c, nlp)
+
+                # process conclusion
+                if decision is True:
+                    true_orgs.append(org)
+                elif decision == 'maybe':
+                    single_orgs.append(org)
+        for org in single_orgs:
+            extraction.org = org
+            extraction.true_orgs = true_orgs
+            extraction.doc = doc_c
+            true_orgs = extraction.check_single_orgs()
+    finally:
+        # the mentions counted in the texts of this document are of no use for the next one, also if a check failed
+        OrganisationExtraction.clear_document_caches()
     return sorted(list(set(true_orgs)))
 
 
@@ -109,8 +143,8 @@ def decide_org(org: str, pco: tuple, org_pp: np.array, org_c: np.array, nlp: sta
         infile (str): Path to the input PDF file.
         pco (tuple): tuple of percentage (float), percentage of mentioned at which the organisation was found as org,
             n_orgs (int) number of times the oganisation was mentioned in the text
-        org_pp (np.array): array of unique organoisations found in the text found using preprocessing mentod 3
-        org_c (np.array): array of unique organoisations found in the text found using preprocessing mentod 1
+        org_pp (np.array or set): unique organoisations found in the text found using preprocessing mentod 3
+        org_c (np.array or Counter): unique organoisations found in the text found using preprocessing mentod 1
         nlp (stanza.Pipeline): The stanza language model used for text processing.
 
     Returns:
@@ -120,7 +154,7 @@ def decide_org(org: str, pco: tuple, org_pp: np.array, org_c: np.array, nlp: sta
     extraction = OrganisationExtraction(org=org, nlp=nlp)
     final = False
 
-    is_org = extraction.individual_org_check()
+    # whether the standalone org is an ORG is only determined (with NER) when needed for a decision
     per_c, n_c, per_p, n_p = pco[0][0], pco[0][1], pco[1][0], pco[1][1]
 
     # decision tree
@@ -135,17 +169,18 @@ def decide_org(org: str, pco: tuple, org_pp: np.array, org_c: np.array, nlp: sta
             final = True
     elif n_p == 1 and n_c == 1:
         kw_check = extraction.keyword_check(final=final)
-        if per_p == per_c == 100. and ((org in org_pp) or (is_org is True) or (kw_check is True)):
+        if per_p == per_c == 100. and ((org in org_pp) or (extraction.individual_org_check() is True) or
+                                       (kw_check is True)):
             final = 'maybe'
-        elif per_p == 100. and (org in o for o in org_c) and ((org in org_pp) or
-                                                              (is_org is True) or
-                                                              (kw_check is True)):
+        elif per_p == 100. and any(org in o for o in org_c) and ((org in org_pp) or
+                                                                 (extraction.individual_org_check() is True) or
+                                                                 (kw_check is True)):
             final = 'maybe'
         elif (org in org_pp) and (kw_check is True):
             final = 'maybe'
         else:
             final = 'no'
-    elif (is_org and org in org_pp):
+    elif (org in org_pp and extraction.individual_org_check()):
         if per_p == -10 or per_c == -10:
             final = 'no'
         else:
@@ -157,6 +192,29 @@ def decide_org(org: str, pco: tuple, org_pp: np.array, org_c: np.array, nlp: sta
     return final
 
 
+def individual_check_needed(org: str, pco: tuple, org_pp: np.array, org_c: np.array):
+    """Determine if decide_org needs to check whether the standalone potential ORG is considered an ORG by Stanza.
+
+    This follows the decision tree of decide_org, which only checks the standalone org if the decision depends on it.
+
+    Args:
+        org (str): The organisation candidate.
+        pco (tuple): tuple of percentage (float), percentage of mentioned at which the organisation was found as org,
+            n_orgs (int) number of times the oganisation was mentioned in the text
+        org_pp (np.array or set): unique organoisations found in the text found using preprocessing mentod 3
+        org_c (np.array or Counter): unique organoisations found in the text found using preprocessing mentod 1
+
+    Returns:
+        bool: True if decide_org checks the standalone org
+    """
+    per_c, n_c, per_p, n_p = pco[0][0], pco[0][1], pco[1][0], pco[1][1]
+    if n_p >= 3 or n_c >= 3 or n_p == 2:
+        return False
+    if n_p == 1 and n_c == 1:
+        return org not in org_pp and per_p == 100. and (per_c == 100. or any(org in o for o in org_c))
+    return org in org_pp
+
+
 def match_anbis(df_in: pd.DataFrame, anbis_file: str):
     """Match potential organizations with known ANBI information.
 
@@ -174,10 +232,11 @@ def match_anbis(df_in: pd.DataFrame, anbis_file: str):
     df = pd.read_csv(anbis_file, usecols=["rsin", "currentStatutoryName", "shortBusinessName"],
                      dtype=str)
     df_match = df_in
+    lookup = matching_lookup(df, 'currentStatutoryName', 'shortBusinessName')
     df_match['matched_anbi'] = df_match['mentioned_organization'].apply(lambda x: apply_matching(
                                                                         df,
                                                                         x, 'currentStatutoryName',
-                                                                        'shortBusinessName'))
+                                                                        'shortBusinessName', lookup))
 
     # perform join between df_match and df based on matched_anbi and currentStatutoryName
     df1 = df_match.merge(df[df['currentStatutoryName'].notnull()], how='left',
@@ -199,26 +258,54 @@ def match_anbis(df_in: pd.DataFrame, anbis_file: str):
     return df_out.sort_values(by=['Input_file', 'mentioned_organization'])
 
 
-def apply_matching(df: pd.DataFrame, m: str, c2: str, c3: str):
+def apply_matching(df: pd.DataFrame, m: str, c2: str, c3: str, lookup: dict = None):  # pylint: disable=too-many-arguments
     """Apply matching of name to df.
 
     This funcion tries to match name 'm' with values in either the c2 or c3 column of a dataframe,
-    allowing for the term 'stichting' to be added to the name m for matching.
+    allowing for the term 'stichting' to be added to the name m for matching. If multiple values match,
+    the first one in sorted order is returned.
 
      Args:
         df (pandas.DataFrame): The DataFrame containing potential matching options.
         m (str): The organisation name to be matched.
         c2 (str): The name of the first column to search for matches.
         c3 (str): The name of the second column to search for matches.
+        lookup (dict, optional): The lookup of matching options as returned by 'matching_lookup' for the same
+            'df', 'c2' and 'c3'. It is created if not provided, which allows it to be reused when matching
+            multiple names.
 
     Returns:
         str or None: The matched organizational name if found, or None if no match is found.
 
     """
+    if lookup is None:
+        lookup = matching_lookup(df, c2, c3)
+    matches = [lookup[key] for key in (m.lower(), 'stichting ' + m.lower()) if key in lookup]
+    if matches:
+        return min(matches)[1]
+    return None
+
+
+def matching_lookup(df: pd.DataFrame, c2: str, c3: str):
+    """Create a lookup of the matching options in df.
+
+    This function collects the unique values in the c2 and c3 columns of a dataframe, in sorted order, and maps
+    the lowercased version of each value to its position and the value itself. If multiple values have the same
+    lowercased version, the first one in sorted order is kept.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame containing potential matching options.
+        c2 (str): The name of the first column with matching options.
+        c3 (str): The name of the second column with matching options.
+
+    Returns:
+        dict: A dictionary with lowercased matching options as keys and tuples of the position in sorted order
+            and the matching option as values.
+    """
     cc2 = df[df[c2].notnull()][c2].to_numpy()
     cc3 = df[df[c3].notnull()][c3].to_numpy()
     match_options = np.unique(np.append(cc2, cc3))
-    for mo in match_options:
-        if mo.lower() == m.lower() or mo.lower() == 'stichting ' + m.lower():
-            return mo
-    return None
+    lookup = {}
+    for i, mo in enumerate(match_options):
+        lookup.setdefault(mo.lower(), (i, mo))
+    return lookup
@@ -1,21 +1,90 @@
 """This file contains functions used to download pdf files from an url and preprocess the text in pdf files.
 
 Functions:
+- extract_pdf_text
+- pdf_file_hash
 - preprocess_pdf
+- pipeline_config
+- process_pdf_variants
+- write_cache_file
 - download_pdf
 - delete_downloaded_pdf
 """
 
+import hashlib
+import logging
 import os
+import re
+import shutil
+import tempfile
 import urllib.request
+from functools import lru_cache
 import pdftotext
+import stanza
+
+
+# repeated spaces and punctuation, each collapsed in a single pass instead of replacing pairs until none are left
+COLON_DOTS = re.compile(r':\.+')
+SPACES = re.compile(' {2,}')
+SPACED_COMMAS = re.compile(', ,(?: ,)*')
+COMMAS = re.compile(',{2,}')
+SPACED_DOTS = re.compile(r'\. \.(?: \.)*')
+DOTS = re.compile(r'\.{2,}')
+
+# size in bytes of the chunks in which downloaded files are written
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# number of PDF files of which the extracted text is cached
+PDF_TEXT_CACHE_SIZE = 8
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=PDF_TEXT_CACHE_SIZE)
+def extract_pdf_text(infile: str, modified: int = None, size: int = None):  # pylint: disable=unused-argument
+    """Extract the text of all pages of a PDF file.
+
+    The text is cached, so that a PDF file that is preprocessed in different ways is only read and parsed once.
+    The cache is keyed on the path and on 'modified' and 'size' of the file, so that a file that is replaced
+    is read again. 'download_pdf' clears the cache, as the next downloaded.pdf may have the same key.
+
+    Args:
+        infile (str): The path to the PDF file.
+        modified (int, optional): The modification time of the file in nanoseconds.
+        size (int, optional): The size of the file in bytes.
+
+    Returns:
+        str: The text of the pages of the PDF file, separated by newlines.
+    """
+    with open(infile, 'rb') as f:
+        pdf = pdftotext.PDF(f)
+    return "\n".join(pdf)
+
+
+@lru_cache(maxsize=PDF_TEXT_CACHE_SIZE)
+def pdf_file_hash(infile: str, modified: int = None, size: int = None):  # pylint: disable=unused-argument
+    """Calculate the md5 hash of the content of a PDF file.
+
+    Like 'extract_pdf_text', the hash is cached on the path and on 'modified' and 'size' of the file, so that the file
+    is only read and hashed once.
+
+    Args:
+        infile (str): The path to the PDF file.
+        modified (int, optional): The modification time of the file in nanoseconds.
+        size (int, optional): The size of the file in bytes.
+
+    Returns:
+        str: The hexadecimal md5 hash of the file.
+    """
+    with open(infile, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
 
 
 def preprocess_pdf(infile: str, r_blankline: str = ', ', r_eol: str = ' ', r_par: str = ''):
     """Preprocesses the text extracted from a PDF file.
 
-    This function takes the path of a PDF file, reads the text content, and performs several text
-    preprocessing steps to clean and format the text.
+    This function takes the path of a PDF file, reads the text content (using 'extract_pdf_text'), and performs
+    several text preprocessing steps to clean and format the text.
 
     Args:
         infile (str): The path to the PDF file.
@@ -26,44 +95,124 @@ def preprocess_pdf(infile: str, r_blankline: str = ', ', r_eol: str = ' ', r_par
     Returns:
         str: The preprocessed text extracted from the PDF file.
     """
-    with open(infile, 'rb') as f:
-        pdf = pdftotext.PDF(f)
+    stat = os.stat(infile)
+    text = extract_pdf_text(infile, stat.st_mtime_ns, stat.st_size)
 
     # preprocessing steps
-    text = "\n".join(pdf)
     text = text.replace('\n\n', r_blankline).replace('\r\n\r\n', r_blankline).replace('\n', r_eol)
     text = text.replace('\r', ' ').replace('\t', ' ')
     text = text.replace('(', r_par).replace(')', r_par).replace(';', ',')
     text = text.replace('\x0c', ' ').replace('\x07', ' ').replace('\x08', ' ').replace('\xad', ' ')
     text = text.replace('•', ', ').replace('', ', ').replace('◼', ', ').replace('\uf0b7', ' ')
     text = text.replace('/', ' / ')
-    while ':.' in text:
-        text = text.replace(':.', ':')
-    text = text.replace(':', ', ')
-    while '  ' in text:
-        text = text.replace('  ', ' ')
-    while ', ,' in text:
-        text = text.replace(', ,', ',')
-    while ',,' in text:
-        text = text.replace(',,', ',')
-    while ' ,' in text:
-        text = text.replace(' ,', ',')
-    text = text.replace('.,', '.')
-    while '. .' in text:
-        text = text.replace('. .', '.')
-    while '..' in text:
-        text = text.replace('..', '.')
-    while ' .' in text:
-        text = text.replace(' .', '.')
+    text = COLON_DOTS.sub(':', text).replace(':', ', ')
+    text = SPACES.sub(' ', text)
+
+    # after the spaces are collapsed, removing a space before a comma or dot cannot create a new one
+    text = COMMAS.sub(',', SPACED_COMMAS.sub(',', text)).replace(' ,', ',').replace('.,', '.')
+    text = DOTS.sub('.', SPACED_DOTS.sub('.', text)).replace(' .', '.')
     return text
 
 
+def pipeline_config(nlp: stanza.Pipeline):
+    """Describe the configuration of a stanza pipeline that determines its output.
+
+    The description consists of the stanza and resources versions, the language, the processors and the settings of
+    the processors (e.g. their packages and model paths), so that it is the same for equally configured pipelines.
+
+    Args:
+        nlp (stanza.Pipeline): The stanza pipeline.
+
+    Returns:
+        str: The description of the pipeline.
+    """
+    processors = sorted(nlp.processors)
+    config = sorted((key, str(value)) for key, value in nlp.config.items()
+                    if key in ('lang', 'package') or key.split('_')[0] in processors)
+    return repr((stanza.__version__, stanza.__resources_version__, processors, config))
+
+
+def process_pdf_variants(infile: str, nlp: stanza.Pipeline, variants: list, cache_dir: str = None):
+    """Preprocess the text of a PDF file in different ways and apply the stanza pipeline to each of the texts.
+
+    All texts that need to be processed are processed by the pipeline in one bulk call. If a cache directory
+    is given, the processed documents are stored in it, with a file name based on the content of the PDF file,
+    the preprocessing arguments and the configuration of the pipeline (see 'pipeline_config'). They are read
+    from it instead of being processed again for the same PDF file, preprocessing arguments and pipeline.
+    The cached documents are pickled, so the cache directory must be trusted. A cached document that cannot be read
+    (e.g. a file left behind by an interrupted run) is processed again and overwritten.
+
+    Args:
+        infile (str): The path to the PDF file.
+        nlp (stanza.Pipeline): The stanza pipeline used to process the texts.
+        variants (list): A list of dictionaries with the keyword arguments for preprocess_pdf for each text.
+        cache_dir (str, optional): The (trusted) directory in which processed documents are cached. Defaults to None,
+            in which case nothing is cached.
+
+    Returns:
+        list: The stanza processed documents (stanza.Document), in the order of 'variants'.
+    """
+    docs = [None] * len(variants)
+    cache_files = []
+    if cache_dir:
+        stat = os.stat(infile)
+        file_hash = pdf_file_hash(infile, stat.st_mtime_ns, stat.st_size)
+        pipeline = pipeline_config(nlp)
+        for i, variant in enumerate(variants):
+            variant_hash = hashlib.md5(repr((pipeline, sorted(variant.items()))).encode('utf-8')).hexdigest()
+            cache_files.append(os.path.join(cache_dir, f'{file_hash}_{variant_hash}.pkl'))
+            if os.path.exists(cache_files[i]):
+                try:
+                    with open(cache_files[i], 'rb') as f:
+                        docs[i] = stanza.Document.from_serialized(f.read())
+                except Exception:  # pylint: disable=broad-except
+                    logger.warning('Could not read cached document %s, processing it again', cache_files[i])
+
+    todo = [i for i, doc in enumerate(docs) if doc is None]
+    if todo:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        for i, doc in zip(todo, nlp.bulk_process([preprocess_pdf(infile, **variants[i]) for i in todo])):
+            docs[i] = doc
+            if cache_dir:
+                write_cache_file(cache_files[i], doc.to_serialized())
+    return docs
+
+
+def write_cache_file(filename: str, data: bytes):
+    """Write a file in the cache directory atomically.
+
+    The data is written to a temporary file in the same directory, which then replaces the file, so that an
+    interrupted run or another process writing the same file never leaves a partially written file behind.
+
+    Args:
+        filename (str): The path to the file.
+        data (bytes): The content of the file.
+    """
+    fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmpfile, filename)
+    except BaseException:
+        os.remove(tmpfile)
+        raise
+
+
 def download_pdf(url):
-    """Download a pdf file from an url and safe it in the cwd."""
+    """Download a pdf file from an url and safe it in the cwd.
+
+    The file is copied in chunks, without reading the whole file into memory first.
+    Every download is saved as downloaded.pdf, possibly with the same size and (on filesystems with a coarse
+    resolution) modification time as the previous one, so the cached texts and hashes of 'extract_pdf_text' and
+    'pdf_file_hash' are cleared.
+    """
     with urllib.request.urlopen(url) as urlfile:
         filename = os.path.join(os.getcwd(), "downloaded.pdf")
         with open(filename, 'wb') as file:
-            file.write(urlfile.read())
+            shutil.copyfileobj(urlfile, file, DOWNLOAD_CHUNK_SIZE)
+    extract_pdf_text.cache_clear()
+    pdf_file_hash.cache_clear()
     return filename
 
 
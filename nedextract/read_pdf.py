@@ -4,8 +4,10 @@ The different functions use the stanza Dutch pipeline to extract
 information on persons and organisations from pdf files and structure the output.
 """
 
+import logging
 import os
-from datetime import datetime
+from collections import Counter
+from functools import lru_cache
 import numpy as np
 import stanza
 from .classify_organisation import predict_main_sector
@@ -15,6 +17,9 @@ from .preprocessing import preprocess_pdf
 from .utils.orgs_checks import OrganisationExtraction
 
 
+logger = logging.getLogger(__name__)
+
+
 class PDFInformationExtractor:
     """Class for extracting information from PDF files using the stanza pipeline.
 
@@ -29,20 +34,28 @@ class PDFInformationExtractor:
         pf_m (str): The path to the pretrained classifier file for sector prediction.
         pf_l (str): The path to the pretrained label encoding file for sector prediction.
         pf_v (str): The path to the pretrained tf-idf vectorizer file for sector prediction.
+        cache_dir (str): The directory in which NER processed texts are cached, or None if nothing is cached.
 
     Methods:
-        extract_pdf(infile: str, opd_p: np.array, opd_g: np.array, opd_o: np.array):
+        extract_pdf(infile: str, opd_p: np.array, opd_g: np.array, opd_o: np.array, doc: stanza.Document,
+                    nlp: stanza.Pipeline):
             Extract information from a PDF file using the stanza pipeline
-        output_people(infile: str, doc, organization: str): Gathers information about people
-                                                            and structures the output.
-        output_related_orgs(infile: str, doc: stanza.doc, nlp: stanza.Pipeline):
+        extract_pdfs(infiles: list, opd_p: np.array, opd_g: np.array, opd_o: np.array):
+            Extract information from multiple PDF files, processing their texts with the stanza pipeline at once
+        output_people(infile: str, doc, organization: str, nlp: stanza.Pipeline, persons: np.array): Gathers
+            information about people and structures the output.
+        has_text(text: str): Checks if a text contains any letters or digits.
+        collect_entities(doc: stanza.Document): Collects the organizations and persons in a document in one pass.
+        output_related_orgs(infile: str, doc: stanza.doc, nlp: stanza.Pipeline, cache_dir: str):
             Gathers information about mentioned organizations and structures the output.
         ots(inp: np.array): Converts array output to a backspace-seperated string
         atc(inp: np.array, length: int): Splits an array into [length] variables for output columns.
         download_stanza_NL(): Downloads the stanza Dutch library if not already present.
+        load_pipeline(): Loads the stanza Dutch pipeline once and returns the same pipeline on later calls.
     """
 
-    def __init__(self, tasks, pf_m: str = None, pf_l: str = None, pf_v: str = None):
+    def __init__(self, tasks, pf_m: str = None, pf_l: str = None,  # pylint: disable=too-many-arguments
+                 pf_v: str = None, cache_dir: str = None):
         """Initialize the PDFInformationExtractor class with pretrained model file paths.
 
         Args:
@@ -51,20 +64,25 @@ class PDFInformationExtractor:
             pf_m (str): The path to the pretrained classifier file for sector prediction.
             pf_l (str): The path to the pretrained label encoding file for sector prediction.
             pf_v (str): The path to the pretrained tf-idf vectorizer file for sector prediction.
+            cache_dir (str): The directory in which NER processed texts are cached. Defaults to None, in which
+                case nothing is cached.
         """
         self.tasks = tasks
         self.pf_m = pf_m or os.path.join(os.getcwd(), 'Pretrained', 'trained_sector_classifier.joblib')
         self.pf_l = pf_l or os.path.join(os.getcwd(), 'Pretrained', 'labels_sector_classifier.joblib')
         self.pf_v = pf_v or os.path.join(os.getcwd(), 'Pretrained', 'tf_idf_vectorizer.joblib')
+        self.cache_dir = cache_dir
         self.nlp = None
 
-    def extract_pdf(self, infile: str, opd_p: np.array, opd_g: np.array, opd_o: np.array):
+    def extract_pdf(self, infile: str, opd_p: np.array,  # pylint: disable=too-many-arguments
+                    opd_g: np.array, opd_o: np.array, doc=None, nlp=None):
         """Extract information from a PDF file using the stanza pipeline.
 
         This function extracts information from a given PDF file ('infile') using the stanza pipeline.
         It takes the following steps:
 
-        1. Preprocesses the PDF file using the 'preprocess_pdf' function.
+        1. Preprocesses the PDF file using the 'preprocess_pdf' function, unless the stanza processed
+        document of the preprocessed text is provided as 'doc'.
         2. Based on the specified 'tasks', different extraction processes are performed:
         - If the only 'task' specified is 'sectors', it predicts the main sector using a
             pretrained classifier (given by the files pf_m, pf_l, pf_v) and updates the output 'opd_g'.
@@ -72,70 +90,113 @@ class PDFInformationExtractor:
             and extracts unique persons and organizations. Next, depending on the specified 'tasks',
             the functions output_people ('task' 'people'), output_related_orgs ('task' 'orgs'),
             and predict_main_sector ('task', 'sectors') are appied. Results are used to update opd_p,
-            opd_o, and opd_g respectively.
+            opd_o, and opd_g respectively. If the text contains no letters or digits at all, e.g. for a scanned
+            PDF file, the stanza pipeline is not applied and only empty results are added to the output.
 
         Args:
             infile (str): The path to the input PDF file for information extraction.
             opd_p (numpy.ndarray): A numpy array containing output for people mentioned in pdf.
             opd_g (numpy.ndarray): A numpy array containing predicted sector in a pdf.
             opd_o (numpy.ndarray): A numpy array containing related organizations mentioned in a pdf.
+            doc (stanza.Document, optional): The stanza processed preprocessed text of the PDF file, if already
+                available.
+            nlp (stanza.Pipeline, optional): The stanza pipeline to use. A new Dutch pipeline is created if
+                not provided.
 
         Returns:
             opd_p (identified people), opd_g (predicted sector), opd_o (related organisations); all stored
             in updated np.arrays
         """
-        print(f"{datetime.now():%Y-%m-%d %H:%M:%S}", 'Working on file:', infile)
-        text = preprocess_pdf(infile, ', ')
+        logger.info('Working on file: %s', infile)
+        filename = os.path.basename(infile)
+        text = doc.text if doc is not None else preprocess_pdf(infile, ', ')
         if self.tasks == ['sectors']:
             main_sector = predict_main_sector(self.pf_m, self.pf_l, self.pf_v, text)
             opd_g = np.concatenate((opd_g,
-                                    np.array([[os.path.basename(infile), '', main_sector]])),
+                                    np.array([[filename, '', main_sector]])),
                                    axis=0)
         else:
-            # Apply pre-trained Dutch stanza pipeline to text
-            self.download_stanza_NL()
-            nlp = stanza.Pipeline(lang='nl', processors='tokenize,ner')
-            doc = nlp(text)
-
-            # Extract all unique persons and organizations from the text using the named entity recognition function of stanza
-            organizations, corg = np.unique([f'{ent.text}' for ent in doc.ents if ent.type == "ORG"],
-                                            return_counts=True)
+            if doc is None and not self.has_text(text):
+                # no extractable text (e.g. a scanned PDF), so there are no entities and the stanza pipeline is skipped
+                logger.info('No text found in file: %s', infile)
+                corg, persons = Counter(), None
+            else:
+                # Apply pre-trained Dutch stanza pipeline to text
+                if nlp is None:
+                    nlp = self.load_pipeline()
+                if doc is None:
+                    doc = nlp(text)
+
+                # Collect the organizations and persons in the text found by the named entity recognition function
+                # of stanza
+                corg, persons = self.collect_entities(doc)
 
             # call corresponding functions for each specified tasks
             try:
-                organization = organizations[np.argmax(corg)]
+                # most mentioned organization, ties are broken alphabetically; raises ValueError if there are none
+                organization = min(corg, key=lambda org: (-corg[org], org))
                 if 'people' in self.tasks or 'all' in self.tasks:
-                    outp_people = self.output_people(infile, doc, organization)
+                    outp_people = self.output_people(infile, doc, organization, nlp, persons)
                     opd_p = np.concatenate((opd_p, np.array([outp_people])), axis=0)
                 if 'orgs' in self.tasks or 'all' in self.tasks:
-                    orgs_details = self.output_related_orgs(infile, doc, nlp)
-                    for org_details in orgs_details:
-                        opd_o = np.concatenate((opd_o, np.array([org_details])), axis=0)
+                    orgs_details = self.output_related_orgs(infile, doc, nlp, self.cache_dir)
+                    if orgs_details:
+                        opd_o = np.concatenate((opd_o, np.array(orgs_details)), axis=0)
                 if 'sectors' in self.tasks or 'all' in self.tasks:
                     main_sector = predict_main_sector(self.pf_m, self.pf_l, self.pf_v, text)
                     opd_g = np.concatenate((opd_g,
-                                            np.array([[os.path.basename(infile), organization, main_sector]])),
+                                            np.array([[filename, organization, main_sector]])),
                                            axis=0)
             except ValueError:
                 organization = ''
-                outp_people = self.atc([os.path.basename(infile)], 91)
+                outp_people = self.atc([filename], 91)
                 opd_p = np.concatenate((opd_p, np.array([outp_people])), axis=0)
                 opd_g = np.concatenate((opd_g,
-                                        np.array([[os.path.basename(infile), organization, '']])),
+                                        np.array([[filename, organization, '']])),
                                        axis=0)
                 opd_o = np.concatenate((opd_o, np.array([['', '', '']])), axis=0)
 
-        print(f"{datetime.now():%Y-%m-%d %H:%M:%S}", 'Finished file:', infile)
+        logger.info('Finished file: %s', infile)
         return opd_p, opd_g, opd_o
 
-    def output_people(self, infile: str, doc, organization: str):
+    def extract_pdfs(self, infiles: list, opd_p: np.array, opd_g: np.array, opd_o: np.array):
+        """Extract information from multiple PDF files using the stanza pipeline.
+
+        This function applies 'extract_pdf' to each of the PDF files in 'infiles', using one stanza pipeline.
+        Unless the only 'task' is 'sectors', the preprocessed texts of all files are processed by the pipeline
+        in a single bulk call, instead of one call per file. Texts without any letters or digits are not processed
+        by the pipeline, 'extract_pdf' adds empty results for these files.
+
+        Args:
+            infiles (list): The paths to the input PDF files for information extraction.
+            opd_p (numpy.ndarray): A numpy array containing output for people mentioned in pdf.
+            opd_g (numpy.ndarray): A numpy array containing predicted sector in a pdf.
+            opd_o (numpy.ndarray): A numpy array containing related organizations mentioned in a pdf.
+
+        Returns:
+            list: For each PDF file, the output of 'extract_pdf' given opd_p, opd_g and opd_o.
+        """
+        nlp = None
+        docs = [None] * len(infiles)
+        if self.tasks != ['sectors']:
+            texts = [preprocess_pdf(infile, ', ') for infile in infiles]
+            with_text = [i for i, text in enumerate(texts) if self.has_text(text)]
+            if with_text:
+                nlp = self.load_pipeline()
+                for i, doc in zip(with_text, nlp.bulk_process([texts[i] for i in with_text])):
+                    docs[i] = doc
+        return [self.extract_pdf(infile, opd_p, opd_g, opd_o, doc, nlp) for infile, doc in zip(infiles, docs)]
+
+    def output_people(self, infile: str, doc, organization: str,  # pylint: disable=too-many-arguments, too-many-locals
+                      nlp: stanza.Pipeline = None, persons: np.array = None):
         """Gather information about people and structure the output.
 
         This function gathers information about people (persons) mentioned in the provided 'doc'
         (a stanza-processed document) and structures the output for further processing. The function
         performs the following steps:
 
-        1. Extracts unique persons using named entity recognition (NER) from the 'doc' document.
+        1. Extracts unique persons using named entity recognition (NER) from the 'doc' document, unless they are
+        already provided.
         2. Calls the 'extract_persons' function to categorize the extracted persons into different roles,
         such as ambassadors, board positions, directors, etc.
         3. If the initial extraction results seem unlikely or insufficient, the function preprocesses the
@@ -149,6 +210,9 @@ class PDFInformationExtractor:
             infile (str): The path to the input PDF file for information extraction.
             doc (stanza.Document): A stanza-processed document containing named entity recognition results.
             organization (str): The main organization mentioned in the text.
+            nlp (stanza.Pipeline, optional): The stanza pipeline used to reprocess the text. The Dutch pipeline
+                from 'load_pipeline' is used if not provided.
+            persons (np.array, optional): The sorted unique persons in 'doc', as returned by 'collect_entities'.
 
         Returns:
             list: A list containing structured output information, including:
@@ -160,23 +224,25 @@ class PDFInformationExtractor:
                     directors, raad van toezicht, bestuursleden, ledenraad, kascommissie, controlecommisie
         """
         # Collect unique persons named in text
-        persons = np.unique([f'{ent.text}' for ent in doc.ents if ent.type == "PER"])
+        if persons is None:
+            _, persons = self.collect_entities(doc)
 
         # call extract_persons function
         (ambassadors, board_positions, p_directeur, p_rvt, p_bestuur, p_ledenraad,
          p_kasc, p_controlec) = extract_persons(doc, persons)
 
-        # Combine results
-        board = np.concatenate([p_directeur, p_bestuur, p_rvt, p_ledenraad, p_kasc, p_controlec])
-
         # try again if unlikely results
         if (len(p_rvt) > 12 or len(p_bestuur) > 12 or (len(p_rvt) == 0 and len(p_bestuur) == 0) or
                 len(board_positions) <= 3):
-            doc = stanza.Pipeline(lang='nl', processors='tokenize,ner')(preprocess_pdf(infile, '. '))
-            persons = np.unique([f'{ent.text}' for ent in doc.ents if ent.type == "PER"])
+            if nlp is None:
+                nlp = self.load_pipeline()
+            doc = nlp(preprocess_pdf(infile, '. '))
+            _, persons = self.collect_entities(doc)
             (ambassadors, board_positions, p_directeur, p_rvt, p_bestuur,
              p_ledenraad, p_kasc, p_controlec) = extract_persons(doc, persons)
-            board = np.concatenate([p_directeur, p_bestuur, p_rvt, p_ledenraad, p_kasc, p_controlec])
+
+        # Combine results
+        board = [*p_directeur, *p_bestuur, *p_rvt, *p_ledenraad, *p_kasc, *p_controlec]
 
         # Structure output
         output = [os.path.basename(infile), organization, self.ots(persons), self.ots(ambassadors), self.ots(board),
@@ -190,13 +256,14 @@ class PDFInformationExtractor:
         return output
 
     @staticmethod
-    def output_related_orgs(infile: str, doc, nlp):
+    def output_related_orgs(infile: str, doc, nlp, cache_dir: str = None):
         """Gather information about all mentioned orgnaizations in the text and structure the output.
 
         Args:
             infile (str): The path to the input PDF file for information extraction.
             doc (stanza.Document): A stanza-processed document containing information about named entities.
             nlp (stanza.Pipeline): The stanza pipeline object for natural language processing.
+            cache_dir (str, optional): The directory in which the NER processed texts are cached. Defaults to None.
 
         Returns:
             list: A list of lists, where each sublist contains the following information:
@@ -204,22 +271,50 @@ class PDFInformationExtractor:
                 - The name of the organization mentioned in the text.
                 - The number of times the organization is mentioned in the text.
         """
-        orgs = collect_orgs(infile, nlp)
-        output = []
-        for org in orgs:
-            n_org = OrganisationExtraction(doc=doc, org=org).count_number_of_mentions()
-            output_p = [os.path.basename(infile), org, str(n_org)]
-            if n_org > 0:
-                output.append(output_p)
-        return output
+        orgs = collect_orgs(infile, nlp, cache_dir)
+        filename = os.path.basename(infile)
+        n_orgs = OrganisationExtraction.count_all_mentions(orgs, doc)
+        return [[filename, org, str(n_org)] for org, n_org in zip(orgs, n_orgs) if n_org > 0]
+
+    @staticmethod
+    def has_text(text: str):
+        """Check if a text contains any letters or digits, i.e. whether it can contain any named entities.
+
+        Args:
+            text (str): The preprocessed text of a PDF file.
+
+        Returns:
+            bool: False if the text contains no letters or digits, e.g. for a scanned PDF file, True otherwise.
+        """
+        return any(char.isalnum() for char in text)
+
+    @staticmethod
+    def collect_entities(doc):
+        """Collect the organizations and persons in a stanza processed document in a single pass over its entities.
+
+        Args:
+            doc (stanza.Document): A stanza-processed document containing named entity recognition results.
+
+        Returns:
+            corg (Counter): The number of mentions of each organization (entities of type 'ORG').
+            persons (np.array): The sorted unique persons (entities of type 'PER').
+        """
+        corg = Counter()
+        persons = set()
+        for ent in doc.ents:
+            if ent.type == "ORG":
+                corg[ent.text] += 1
+            elif ent.type == "PER":
+                persons.add(ent.text)
+        return corg, np.unique(list(persons))
 
     @staticmethod
     def ots(inp: np.array):
         r"""Output to string: Convert array output to a backspace-seperated string.
 
         Steps:
-        - define an empty string 'out_string'
-        - for each element in 'inp', add the element to 'out_string', followed by the string '\n'
+        - convert each element in 'inp' to a string, followed by the string '\n'
+        - join these strings into 'out_string' at once
 
         Args:
             inp (np.array): array to be converted to string
@@ -228,9 +323,7 @@ class PDFInformationExtractor:
             out_string: a string containing the elements of the of the 'inp' array,
             converted into a backspace-separed string
         """
-        out_string = ""
-        for element in inp:
-            out_string += str(element) + "\n"
+        out_string = "".join(str(element) + "\n" for element in inp)
         return out_string
 
     def atc(self, inp, length: int):
@@ -239,10 +332,10 @@ class PDFInformationExtractor:
         This function takes the following steps:
 
         - Initializes an output list ('outlist') with [length] empty strings.
-        - If the input array 'inp' is not None, the function iterates through its elements and fills
-        the 'outlist' with the first [length] elements. If there are more elements in the 'inp' array
-        than the specified 'length', it prints a warning message and includes the remaining elements
-        as a single element in the last column.
+        - If the input array 'inp' is not None, the function fills the 'outlist' with the first [length]
+        elements, by slice assignment. If there are more elements in the 'inp' array than the specified
+        'length', it prints a warning message and includes the remaining elements as a single element
+        in the last column.
 
         Args:
             inp (list or None): The input array to be split into columns.
@@ -255,13 +348,13 @@ class PDFInformationExtractor:
         """
         outlist = ['']*length
         if inp is not None:
-            for i, c_inp in enumerate(inp):
-                if i == length - 1 and len(inp) > length:
-                    print("Problem: there are more persons in one of the categories than allocated "
-                          "columns.")
-                    outlist[i] = self.ots(inp[i:])
-                    break
-                outlist[i] = c_inp
+            if len(inp) > length:
+                print("Problem: there are more persons in one of the categories than allocated "
+                      "columns.")
+                outlist[:length - 1] = inp[:length - 1]
+                outlist[length - 1] = self.ots(inp[length - 1:])
+            else:
+                outlist[:len(inp)] = inp
         return outlist
 
     @staticmethod
@@ -286,3 +379,17 @@ class PDFInformationExtractor:
         if not os.path.exists(outfile):
             stanza.download('nl', model_dir=outpath)
         return outfile
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def load_pipeline():
+        """Load the stanza Dutch pipeline for tokenization and named entity recognition.
+
+        Loading the models takes several seconds, so the pipeline is loaded only once per process and the same
+        pipeline is returned on later calls, e.g. for each next file that is processed.
+
+        Returns:
+            stanza.Pipeline: The stanza Dutch pipeline with the processors 'tokenize' and 'ner'.
+        """
+        PDFInformationExtractor.download_stanza_NL()
+        return stanza.Pipeline(lang='nl', processors='tokenize,ner')
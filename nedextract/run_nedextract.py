@@ -2,14 +2,20 @@
 
 Functions:
 - run
+- extract_batch
+- configure_logging
+- configure_package_logging
 - write_output
 
 Copyright 2022 Netherlands eScience Center
 Licensed under the Apache License, version 2.0. See LICENSE for details.
 """
 import argparse
+import logging
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 from datetime import datetime
 import numpy as np
 import pandas as pd
@@ -19,9 +25,15 @@ from .preprocessing import download_pdf
 from .read_pdf import PDFInformationExtractor
 
 
+# number of files in a directory of which the texts are processed by the stanza pipeline at once
+FILES_PER_BATCH = 8
+
+logger = logging.getLogger(__name__)
+
+
 def run(directory=None, file=None, url=None, urlf=None,  # pylint: disable=too-many-arguments, too-many-locals
         tasks='people', anbis=None, model=None, labels=None,
-        vectors=None, write_o=True):
+        vectors=None, write_o=True, cache_dir=None, workers=1):
     """Annual report information extraction.
 
     This function runs the full nedextract pipleline. The pipeline is originally designed to read
@@ -52,6 +64,11 @@ def run(directory=None, file=None, url=None, urlf=None,  # pylint: disable=too-m
         labels (str), only with option 'sectors': The path to the pretrained label encoding file for sector prediction.
         vectors (str), only with option 'sectors': The path to the pretrained tf-idf vectorizer file for sector prediction.
         write_output (bool): if true, the output will be written to an excel file
+        cache_dir (str), optional, only for task 'orgs': directory in which NER processed texts are cached, to be
+            reused when the same files are processed again. The cached texts are pickled, so the directory must be
+            trusted.
+        workers (int), optional, only with option 'directory': number of processes in which batches of files are
+            processed in parallel. Each process loads its own stanza pipeline. Defaults to 1.
 
     Returns:
         df_p, df_g, df_o: pd.DataFrames with results of the three respective tasks
@@ -60,6 +77,9 @@ def run(directory=None, file=None, url=None, urlf=None,  # pylint: disable=too-m
     start_time = f"{datetime.now():%Y-%m-%d %H:%M:%S}"
     print('start time', start_time)
 
+    # show the progress per file, unless the caller configured logging itself
+    configure_package_logging()
+
     if not (directory or file or url or urlf):
         raise FileNotFoundError('No input provided. Run with -h for help on arguments to be provided.')
 
@@ -70,39 +90,63 @@ def run(directory=None, file=None, url=None, urlf=None,  # pylint: disable=too-m
     opd_g = np.array([]).reshape(0, 3)
     opd_o = np.array([]).reshape(0, 3)
 
+    # output per file, each file is processed starting from the empty output arrays above
+    outputs = []
+
     # convert tasks to list
     tasks = [tasks] if isinstance(tasks, str) else tasks
 
     # Create an instance of the PDFInformationExtractor class
-    pdf_extractor = PDFInformationExtractor(tasks, model, labels, vectors)
+    pdf_extractor = PDFInformationExtractor(tasks, model, labels, vectors, cache_dir)
 
     # Read all files
-    countfiles = 0
     if file:
         infile = os.path.join(os.getcwd(), file)
-        opd_p, opd_g, opd_o = pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o)
+        outputs.append(pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o))
     elif directory:
-        totalfiles = len([name for name in os.listdir(os.path.join(os.getcwd(), directory))
-                         if name.lower().endswith('.pdf')])
-        for filename in os.listdir(os.path.join(os.getcwd(), directory)):
-            if filename.lower().endswith('.pdf'):
-                countfiles += 1
-                print('Working on file:', countfiles, 'out of', totalfiles)
-                infile = os.path.join(os.getcwd(), directory, filename)
-                opd_p, opd_g, opd_o = pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o)
+        infiles = [os.path.join(os.getcwd(), directory, filename)
+                   for filename in os.listdir(os.path.join(os.getcwd(), directory))
+                   if filename.lower().endswith('.pdf')]
+        batches = [infiles[start:start + FILES_PER_BATCH] for start in range(0, len(infiles), FILES_PER_BATCH)]
+        if workers > 1:
+            # worker processes that are spawned instead of forked do not inherit the logging configuration
+            with ProcessPoolExecutor(max_workers=workers, initializer=configure_logging,
+                                     initargs=(logging.getLogger('nedextract').getEffectiveLevel(),)) as executor:
+                futures = {executor.submit(extract_batch, batch, tasks, model, labels, vectors, cache_dir): start
+                           for start, batch in zip(range(0, len(infiles), FILES_PER_BATCH), batches)}
+                for future in as_completed(futures):
+                    start = futures[future]
+                    end = min(start + FILES_PER_BATCH, len(infiles))
+                    if future.exception() is not None:
+                        # the exception itself is raised below, when the output is collected
+                        logger.error('Failed files: %d to %d out of %d', start + 1, end, len(infiles))
+                    else:
+                        logger.info('Finished files: %d to %d out of %d', start + 1, end, len(infiles))
+                # keep the output in the order of the files, whatever the order in which the batches finished
+                for future in futures:
+                    outputs.extend(future.result())
+        else:
+            for start, batch in zip(range(0, len(infiles), FILES_PER_BATCH), batches):
+                logger.info('Working on files: %d to %d out of %d', start + 1, start + len(batch), len(infiles))
+                outputs.extend(pdf_extractor.extract_pdfs(batch, opd_p, opd_g, opd_o))
     elif url:
         infile = download_pdf(url)
-        opd_p, opd_g, opd_o = pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o)
+        outputs.append(pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o))
         delete_downloaded_pdf()
     elif urlf:
         with open(urlf, mode='r', encoding='UTF-8') as u_url:
-            urls = u_url.readlines()
+            # one url per line, without the line ending; blank lines are skipped
+            urls = [line.strip() for line in u_url if line.strip()]
         for urlp in urls:
-            print('working on url:', urlp)
-            infile = download_pdf(url)
-            opd_p, opd_g, opd_o = pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o)
+            logger.info('Working on url: %s', urlp)
+            infile = download_pdf(urlp)
+            outputs.append(pdf_extractor.extract_pdf(infile, opd_p, opd_g, opd_o))
             delete_downloaded_pdf()
 
+    # combine the output of all files at once
+    opd_p, opd_g, opd_o = (np.concatenate([opd] + [output[i] for output in outputs])
+                           for i, opd in enumerate((opd_p, opd_g, opd_o)))
+
     df_p, df_g, df_o = output_to_df(opd_p, opd_g, opd_o, anbis)
     # Write output to files
     if write_o:
@@ -114,6 +158,25 @@ def run(directory=None, file=None, url=None, urlf=None,  # pylint: disable=too-m
     return df_p, df_g, df_o
 
 
+def extract_batch(infiles, tasks, model, labels, vectors, cache_dir):  # pylint: disable=too-many-arguments
+    """Extract information from a batch of pdf files, in a separate process.
+
+    Args:
+        infiles (list): paths to the pdf files to be processed.
+        tasks (list): the tasks to execute.
+        model (str): The path to the pretrained classifier file for sector prediction.
+        labels (str): The path to the pretrained label encoding file for sector prediction.
+        vectors (str): The path to the pretrained tf-idf vectorizer file for sector prediction.
+        cache_dir (str): directory in which NER processed texts are cached, or None.
+
+    Returns:
+        list: the output arrays (opd_p, opd_g, opd_o) of each file, in the order of 'infiles'
+    """
+    pdf_extractor = PDFInformationExtractor(tasks, model, labels, vectors, cache_dir)
+    return pdf_extractor.extract_pdfs(infiles, np.array([]).reshape(0, 91), np.array([]).reshape(0, 3),
+                                      np.array([]).reshape(0, 3))
+
+
 def output_to_df(opd_p=None, opd_g=None, opd_o=None, anbis_file=None):
     """
     Convert extracted data in numpy arrays to pandas dataframes with correct column names.
@@ -190,6 +253,42 @@ def write_output(tasks: list,
         print('Output organisations written to:', opf_o)
 
 
+def configure_logging(level=logging.INFO):
+    """Configure logging to show the progress per file, with a timestamp.
+
+    This is used when nedextract is run from the command line, and in each worker process of 'run', with the level
+    of the 'nedextract' logger in the main process.
+
+    Args:
+        level (int): the level from which messages are shown. Defaults to logging.INFO.
+    """
+    logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%Y-%m-%d %H:%M:%S', level=level)
+
+
+def configure_package_logging(level=logging.INFO):
+    """Configure the 'nedextract' logger to show the progress per file, if logging is not configured yet.
+
+    This is used when 'run' is called from Python (e.g. in the tutorials) instead of from the command line. If neither
+    the root logger nor the 'nedextract' logger has a handler, a handler like the one of 'configure_logging' is added to
+    the 'nedextract' logger only, so that the logging of other packages is left as it is. The messages of the
+    'nedextract' logger are then no longer passed on to the root logger.
+
+    Args:
+        level (int): the level from which messages are shown. Defaults to logging.INFO.
+    """
+    package_logger = logging.getLogger('nedextract')
+    if logging.getLogger().handlers or any(not isinstance(handler, logging.NullHandler)
+                                           for handler in package_logger.handlers):
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+    package_logger.addHandler(handler)
+    package_logger.setLevel(level)
+    # forked worker processes inherit this handler and also configure the root logger, which must not show the
+    # messages a second time
+    package_logger.propagate = False
+
+
 # Check if the script is being run directly
 if __name__ == "__main__":
     # Call the run function
@@ -209,10 +308,18 @@ if __name__ == "__main__":
     parser.add_argument('-v', '--vectors', type=str,
                         help="The path to the pretrained tf-idf vectorizer file for sector prediction.")
     parser.add_argument('-w', '--write_o', type=bool, default=True, help="If true, the output will be written to an excel file.")
+    parser.add_argument('-c', '--cache_dir', type=str,
+                        help="Directory in which NER processed texts are cached (for task orgs). The cached texts are "
+                             "pickled, so only use a directory that is trusted and not writable by others.")
+    parser.add_argument('-n', '--workers', type=int, default=1,
+                        help="Number of processes in which the files in a directory are processed in parallel.")
 
     # Parse arguments
     args = parser.parse_args()
 
+    # Show the progress per file, with a timestamp
+    configure_logging()
+
     # Call the run function with arguments
     run(args.directory, args.file, args.url, args.urlf, args.tasks, args.anbis,
-        args.model, args.labels, args.vectors, args.write_o)
+        args.model, args.labels, args.vectors, args.write_o, args.cache_dir, args.workers)
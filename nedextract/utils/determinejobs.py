@@ -1,9 +1,73 @@
 """This file contains the class DetermineJobs with functions to determine job positions."""
 import re
+from collections import defaultdict
+from functools import lru_cache
+import ahocorasick
 import numpy as np
 from .keywords import JobKeywords
 
 
+NON_ALPHANUMERIC = re.compile('[^0-9a-zA-Z ]+')
+JOB_MODIFIERS = re.compile('vice voorzitter|algemeen|adjunct|interim')
+
+
+@lru_cache(maxsize=None)
+def build_keyword_automaton(categories: tuple):
+    """Build an Aho-Corasick automaton for the keywords of a number of categories.
+
+    The keyword lists in JobKeywords are fixed, so the automaton for each combination of categories is built once
+    and reused for all persons in all documents.
+
+    Args:
+        categories (tuple of tuples of str): the keywords of each category
+
+    Returns:
+        ahocorasick.Automaton: automaton that maps each keyword to a tuple containing the keyword and the indices
+        of the categories it belongs to
+    """
+    keyword_categories = defaultdict(list)
+    for c, keywords in enumerate(categories):
+        for keyword in keywords:
+            keyword_categories[keyword].append(c)
+
+    automaton = ahocorasick.Automaton()
+    for keyword, c in keyword_categories.items():
+        automaton.add_word(keyword, (keyword, tuple(c)))
+    automaton.make_automaton()
+    return automaton
+
+
+def is_word_boundary(text: str, pos: int):
+    """Return whether there is a word boundary (regex '\\b') at a position in a text."""
+    word_before = pos > 0 and (text[pos-1].isalnum() or text[pos-1] == '_')
+    word_after = pos < len(text) and (text[pos].isalnum() or text[pos] == '_')
+    return word_before != word_after
+
+
+def find_keywords(text: str, automaton: ahocorasick.Automaton):
+    """Find the keywords of an automaton that occur as whole words in a text.
+
+    The text is scanned once for all keywords. Like a regex search for each keyword, occurrences of the same
+    keyword do not overlap.
+
+    Args:
+        text (str): text to search through
+        automaton (ahocorasick.Automaton): automaton build with 'build_keyword_automaton'
+
+    Yields:
+        tuple: the indices of the categories of each keyword found
+    """
+    if len(automaton) == 0:
+        return
+    keyword_end = {}
+    for end, (keyword, categories) in automaton.iter(text):
+        start = end - len(keyword) + 1
+        if (start >= keyword_end.get(keyword, 0) and is_word_boundary(text, start)
+                and is_word_boundary(text, end + 1)):
+            keyword_end[keyword] = end + 1
+            yield categories
+
+
 class DetermineJobs:
     """Class containing functions to determine jobs.
 
@@ -14,20 +78,28 @@ class DetermineJobs:
     - determine_sub_job
     - surrounding_words
     - count_occurrence
+    - count_categories
+    - main_job_counts
     - relevant_sentences
     """
 
     def __init__(self, main_jobs=None, main_job=None, members=None, doc=None,  # pylint: disable=too-many-arguments'
-                 p_position=None, position=None):
-        """Define class variables."""
+                 p_position=None, position=None, sentence_texts=None):
+        """Define class variables.
+
+        The optional 'sentence_texts' is a list of tuples containing the text and the lowercased text of each
+        sentence in 'doc'. It allows these to be determined once per document instead of once per person.
+        """
         self.main_job = main_job
         self.main_jobs = main_jobs
         self.members = members
         self.doc = doc
+        self.sentence_texts = sentence_texts
         self.p_position = p_position
         self.position = position
         self.sentences = None
         self.surroundings = None
+        self.counts = {}
 
     @staticmethod
     def surrounding_words(text: np.array, search_names: list):
@@ -45,28 +117,27 @@ class DetermineJobs:
             found before and after the 'search_name'.
         """
         # function definitions
-        surrounding_words = np.array([])
-        text = np.array2string(text, separator=' ')
+        surrounding_words = []
+        text = ' '.join(text)
         searchnames = sorted(search_names, key=len, reverse=True)
 
-        # preprocess text
-        for search_name in searchnames:
-            text = text.lower().replace(search_name.lower(), 'search4term')
-        text = re.sub('[^0-9a-zA-Z ]+', ' ', text)
-        text = text.replace('vice voorzitter', 'vicevoorzitter')
-        text = text.replace('algemeen', '')
-        text = text.replace('adjunct', '')
-        text = text.replace('interim', '')
+        # preprocess text: replace the names, longest first, in a single scan
+        text = text.lower()
+        if searchnames:
+            names_pattern = re.compile('|'.join(re.escape(search_name.lower()) for search_name in searchnames))
+            text = names_pattern.sub('search4term', text)
+        text = NON_ALPHANUMERIC.sub(' ', text)
+        text = JOB_MODIFIERS.sub(lambda m: 'vicevoorzitter' if m.group() == 'vice voorzitter' else '', text)
         text_split = text.split()
 
         # obtain surrounding words
         for i, word in enumerate(text_split):
             if word == 'search4term':
                 if i != 0:
-                    surrounding_words = np.append(surrounding_words, text_split[i-1])
+                    surrounding_words.append(text_split[i-1])
                 if i != len(text_split) - 1:
-                    surrounding_words = np.append(surrounding_words, text_split[i+1])
-        return surrounding_words
+                    surrounding_words.append(text_split[i+1])
+        return np.array(surrounding_words)
 
     @staticmethod
     def count_occurrence(text: np.array, search_words: list):
@@ -86,31 +157,50 @@ class DetermineJobs:
             in the entire 'text' and the number of sentences in 'text' that contain at least one
             of the search words.
         """
-        # Preprocess text
-        fulltext = np.array2string(text, separator=' ')
-        fulltext = re.sub(r"[\[\]']", '', fulltext)
-        fulltext = fulltext.replace('vice voorzitter', 'vicevoorzitter')
-        fulltext = fulltext.replace('vice-voorzitter', 'vicevoorzitter')
+        totalcount, totalcount_sentence = DetermineJobs.count_categories(text, [search_words])
+        return int(totalcount[0]), int(totalcount_sentence[0])
+
+    @staticmethod
+    def count_categories(text: np.array, categories: list):
+        """Return for each category the summed total of occurrences of its search words in text.
+
+        This function counts for each category in 'categories' the total number of occurrences of its search words
+        within the provided 'text', and the number of sentences in which any of its search words is found. The text
+        and each sentence are scanned once for the search words of all categories, using an Aho-Corasick automaton.
+        Only whole words are counted, as with a regex search for '\\b' + search word + '\\b'.
+
+        Args:
+            text (np.array): A list of sentences or paragraphs as strings.
+            categories (list of lists of str): A list containing a list of search words for each category.
+
+        Returns:
+            tuple: A tuple containing two arrays with a value for each category: the total count of occurrences of
+            its search words in the entire 'text' and the number of sentences in 'text' that contain at least one
+            of its search words.
+        """
+        automaton = build_keyword_automaton(tuple(tuple(search_words) for search_words in categories))
 
         # Define varibales to be returned
-        totalcount = 0
-        totalcount_sentence = 0
+        totalcount = np.zeros(len(categories), dtype=int)
+        totalcount_sentence = np.zeros(len(categories), dtype=int)
 
         # Determine totalcount
-        for item in search_words:
-            escape_item = re.escape(item)
-            totalcount += sum(1 for _ in re.finditer(r'\b' + escape_item + r'\b', fulltext))
+        fulltext = ' '.join(text)
+        fulltext = fulltext.replace('vice voorzitter', 'vicevoorzitter')
+        fulltext = fulltext.replace('vice-voorzitter', 'vicevoorzitter')
+        for found in find_keywords(fulltext, automaton):
+            for c in found:
+                totalcount[c] += 1
 
         # Determine totalcount_sentence
         for sentence in text:
             sentence = sentence.replace('vice voorzitter', 'vicevoorzitter')
             sentence = sentence.replace('vice-voorzitter', 'vicevoorzitter')
-            count = 0
-            for item in search_words:
-                escape_item = re.escape(item)
-                count = count + sum(1 for _ in re.finditer(r'\b' + escape_item + r'\b', sentence))
-            if count > 0:
-                totalcount_sentence += 1
+            found = set()
+            for c in find_keywords(sentence, automaton):
+                found.update(c)
+            for c in found:
+                totalcount_sentence[c] += 1
         return totalcount, totalcount_sentence
 
     def determine_main_job(self, sentences: list = None, surroundings: list = None):
@@ -151,24 +241,21 @@ class DetermineJobs:
                 - The total frequency of the category 'bestuur' in the surrounding sentences (int).
                 - The total frequency of the category 'rvt' in the surrounding sentences (int).
         """
-        # Define sentence (fs, fss) and total frequencies (ft, fts) for direct sentences and surrounding sentences
-        self.relevant_sentences()
-        if sentences is None:
-            sentences = self.sentences
-        if surroundings is None:
-            surroundings = self.surroundings
-
-        fs = np.empty(len(self.main_jobs))
-        fss = np.empty(len(self.main_jobs))
-        ft = np.empty(len(self.main_jobs))
-        fts = np.empty(len(self.main_jobs))
-
         main_job = np.array([mj[0] for mj in self.main_jobs])
 
-        # Determine ft,fs, fts, and ftss for each job
-        for m, m_j in enumerate(self.main_jobs):
-            ft[m], fs[m] = DetermineJobs.count_occurrence(sentences, m_j)
-            fts[m], fss[m] = DetermineJobs.count_occurrence(surroundings, m_j)
+        # Define sentence (fs, fss) and total frequencies (ft, fts) for direct sentences and surrounding sentences
+        if sentences is None and surroundings is None:
+            ft, fs, fts, fss = self.main_job_counts(self.main_jobs)
+        else:
+            if sentences is None or surroundings is None:
+                if self.sentences is None:
+                    self.relevant_sentences()
+                if sentences is None:
+                    sentences = self.sentences
+                if surroundings is None:
+                    surroundings = self.surroundings
+            ft, fs = DetermineJobs.count_categories(sentences, self.main_jobs)
+            fts, fss = DetermineJobs.count_categories(surroundings, self.main_jobs)
 
         # Select based on most occuring category in the direct text using sentence frequency, no tie
         if (max(fs) > 0 and len(np.where(fs == max(fs))[0]) == 1):
@@ -236,20 +323,17 @@ class DetermineJobs:
                 - The determined sub job category (str) or an empty string if no category is found.
                 - The backup sub job category (str) or an empty string if no category is found.
         """
-        self.relevant_sentences()
         if sentences is None:
+            if self.sentences is None:
+                self.relevant_sentences()
             sentences = self.sentences
 
-        # Define c_sub_jobs
-        c_sub_job = np.array([])
-
         # Determine the surrounding words and use these to determine the count of each sub job
         surrounding_w = DetermineJobs.surrounding_words(sentences, self.members)
-        if surrounding_w.size > 0:
-            for sj in JobKeywords.sub_jobs:
-                c_sub_job = np.append(c_sub_job, DetermineJobs.count_occurrence(surrounding_w, sj)[0])
+        if len(surrounding_w) > 0:
+            c_sub_job = DetermineJobs.count_categories(surrounding_w, JobKeywords.sub_jobs)[0]
         else:
-            c_sub_job = np.append(c_sub_job, 0)
+            c_sub_job = np.array([0])
 
         # Determine sub_cat and backup_sub_cat
         if max(c_sub_job) > 0 and len(np.where(c_sub_job == max(c_sub_job))[0]) == 1:
@@ -261,12 +345,43 @@ class DetermineJobs:
 
         return [sub_cat, backup_sub_cat]
 
+    def main_job_counts(self, main_jobs: list):
+        """Determine the frequencies of main job categories in the relevant sentences of the members.
+
+        The relevant sentences and surroundings are determined once, using 'relevant_sentences'. The frequencies
+        of each category are stored, so that determining the main job again with a different list of main jobs
+        (e.g. the backup main jobs) does not require scanning the sentences again.
+
+        Args:
+            main_jobs (list): A list containing sub-lists of words for each main job category.
+
+        Returns:
+            tuple: A tuple containing four arrays with a value for each category in 'main_jobs':
+                - The total frequency in the direct sentences (ft).
+                - The sentence frequency in the direct sentences (fs).
+                - The total frequency in the surrounding sentences (fts).
+                - The sentence frequency in the surrounding sentences (fss).
+        """
+        if self.sentences is None:
+            self.relevant_sentences()
+
+        missing = [mj for mj in main_jobs if tuple(mj) not in self.counts]
+        if missing:
+            ft, fs = DetermineJobs.count_categories(self.sentences, missing)
+            fts, fss = DetermineJobs.count_categories(self.surroundings, missing)
+            for m, m_j in enumerate(missing):
+                self.counts[tuple(m_j)] = (ft[m], fs[m], fts[m], fss[m])
+
+        counts = np.array([self.counts[tuple(mj)] for mj in main_jobs], dtype=int).reshape(-1, 4)
+        return counts[:, 0], counts[:, 1], counts[:, 2], counts[:, 3]
+
     def relevant_sentences(self):
         """Identify all sentences containing a specific person and those directly surrounding them.
 
         This function takes a stanza Document object 'doc' and a list of 'members', which are different write of the same name
         of a specific person to search for. The function extracts all 'sentences' that contain any of the 'members' and those
-        directly surrounding ('surroundings') them in the document.
+        directly surrounding ('surroundings') them in the document. If 'sentence_texts' is defined, the (lowercased)
+        texts of the sentences are taken from it instead of from 'doc'.
 
         Args:
             doc (stanza.Document): A stanza Document object containing the parsed text.
@@ -280,23 +395,30 @@ class DetermineJobs:
         """
         # Definitions
         prevsentence = ''
-        sentences = np.array([])
-        surroundings = np.array([])
+        sentences = []
+        surroundings = []
+        seen_surroundings = set()
         need_next_sentence = False
 
+        sentence_texts = self.sentence_texts
+        if sentence_texts is None:
+            sentence_texts = [(sentence.text, sentence.text.lower()) for sentence in self.doc.sentences]
+
         # Determine sentences and surroundings
-        for sentence in self.doc.sentences:
-            if any(member in sentence.text for member in self.members):
-                sentences = np.append(sentences, sentence.text.lower())
-                if prevsentence not in list(surroundings):
-                    surroundings = np.append(surroundings, prevsentence)
-                if sentence not in list(surroundings):
-                    surroundings = np.append(surroundings, sentence.text.lower())
+        for text, lower_text in sentence_texts:
+            if any(member in text for member in self.members):
+                sentences.append(lower_text)
+                if prevsentence not in seen_surroundings:
+                    surroundings.append(prevsentence)
+                    seen_surroundings.add(prevsentence)
+                surroundings.append(lower_text)
+                seen_surroundings.add(lower_text)
                 need_next_sentence = True
             elif need_next_sentence:
-                if sentence.text.lower() not in surroundings:
-                    surroundings = np.append(surroundings, sentence.text.lower())
+                if lower_text not in seen_surroundings:
+                    surroundings.append(lower_text)
+                    seen_surroundings.add(lower_text)
                 need_next_sentence = False
-            prevsentence = sentence.text.lower()
-        self.sentences = sentences
-        self.surroundings = surroundings
+            prevsentence = lower_text
+        self.sentences = np.array(sentences)
+        self.surroundings = np.array(surroundings)
@@ -7,6 +7,7 @@ Classes:
 - Titles: a list of common titles.
 - Org_Keywords: multiple lists used to extract organisations from a text.
 """
+import re
 import numpy as np
 
 
@@ -143,3 +144,21 @@ class Org_Keywords:
     # keywords that, when present in pot org, call for the attempt of keyword strip
     search_strip = position + commissie
     functies = ['hoofdfuncties', 'hoofdfunctie', 'nevenfuncties', 'nevenfunctie']
+
+    # compiled versions of the keyword patterns above, as used to check and strip pot. orgs
+    true_keys_re = [re.compile(kw) for kw in true_keys]
+    true_keys_cap_re = [re.compile(r"\b" + kw + r"\b") for kw in true_keys_cap]
+    position_re = [re.compile('^' + p + r"\b", flags=re.IGNORECASE) for p in position]
+    lidwoord_voorzetsels_re = [re.compile('^' + lv) for lv in lidwoord_voorzetsels]
+    raad_re = [re.compile('^' + r + r"\b", flags=re.IGNORECASE) for r in raad]
+    commissie_re = [re.compile('^' + c + r"\b", flags=re.IGNORECASE) for c in commissie]
+    functies_re = [re.compile(f + '$', flags=re.IGNORECASE) for f in functies]
+
+    # alternations of the patterns in each list, that match if any of the patterns in the list matches
+    true_keys_any_re = re.compile('(?:' + '|'.join(true_keys) + ')')
+    true_keys_cap_any_re = re.compile(r"\b(?:" + '|'.join(true_keys_cap) + r")\b")
+    position_any_re = re.compile('^(?:' + '|'.join(position) + r")\b", flags=re.IGNORECASE)
+    lidwoord_voorzetsels_any_re = re.compile('^(?:' + '|'.join(lidwoord_voorzetsels) + ')')
+    raad_any_re = re.compile('^(?:' + '|'.join(raad) + r")\b", flags=re.IGNORECASE)
+    commissie_any_re = re.compile('^(?:' + '|'.join(commissie) + r")\b", flags=re.IGNORECASE)
+    functies_any_re = re.compile('(?:' + '|'.join(functies) + ')$', flags=re.IGNORECASE)
@@ -1,20 +1,40 @@
 """This file contains the class NameAnalysis."""
 import itertools
 import re
+from collections import Counter
+from functools import lru_cache
 import numpy as np
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz
+from rapidfuzz import process
+from rapidfuzz import utils
 from .keywords import Titles
 from .keywords import Tussenvoegsels
 
 
+# all titles in a single pattern, in the order of the list of titles
+TITLES = re.compile('|'.join(re.escape(title) for title in Titles.titles))
+TUSSENVOEGSELS = frozenset(Tussenvoegsels.tussenvoegsels)
+
+
+def process_name(name: str):
+    """Preprocess a name before scoring it, like fuzzywuzzy did: non-ASCII characters are removed.
+
+    Without removing them, names with and without diacritics (e.g. Hélène Bakker and Helene Bakker) would score
+    lower than they did with fuzzywuzzy, and would no longer be grouped.
+    """
+    return utils.default_process(name.encode('ascii', 'ignore').decode('ascii'))
+
+
 class NameAnalysis:
     """This class contains functions used to analyse names.
 
     It contains the functions:
     - abbreviate
+    - token_set_ratio
     - get_tsr
     - strip_names_from_title
     - sort_select_name
+    - remove_duplicate_lists
     - find_similar_names
     - find_duplicate_persons
     """
@@ -24,11 +44,13 @@ class NameAnalysis:
         self.pnames = names
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def abbreviate(name: str, n_ab: int):
         """Abbreviate names.
 
         This function abbreviates the first 'n_ab' terms in a 'name', except if they are tussenvoegsels, and as long
-        as it is not the last term in a name.
+        as it is not the last term in a name. Abbreviations are cached, as the same name is often abbreviated
+        when comparing it to different names.
 
         Args:
             name (str): name to be abbreviated
@@ -38,21 +60,40 @@ class NameAnalysis:
             abbreviation (str): The abbreviated name based on the specified number of terms.
         """
         splitname = name.split()
-        abbreviation = ''
+        terms = []
 
         for i, n in enumerate(splitname):
-            if i < len(splitname)-1 and i <= n_ab and n not in Tussenvoegsels.tussenvoegsels:
-                abbreviation = abbreviation + n[0] + ' '
+            if i < len(splitname)-1 and i <= n_ab and n not in TUSSENVOEGSELS:
+                terms.append(n[0])
             else:
-                abbreviation = abbreviation + n + ' '
-        return abbreviation
+                terms.append(n)
+        return ''.join(term + ' ' for term in terms)
+
+    @staticmethod
+    def token_set_ratio(name1: str, name2: str, score_cutoff: int = 0):
+        """Determine the token set ratio of two names.
+
+        The token set ratio is calculated with rapidfuzz, using its default processor to lowercase the names and
+        remove non alphanumeric characters, and rounded to an integer. Scores that would round to a value below
+        'score_cutoff' are returned as 0, which allows rapidfuzz to stop early for names that cannot match.
+
+        Args:
+            name1 (str): the first name
+            name2 (str): the second name
+            score_cutoff (int): the minimal score of interest
+
+        Returns:
+            token_set_ratio (int): the token set ratio of the two names
+        """
+        return round(fuzz.token_set_ratio(name1, name2, processor=process_name,
+                                          score_cutoff=max(score_cutoff - 0.5, 0)))
 
     @staticmethod
     def get_tsr(p_i: str, p_j: str):
         """Determine the token set ratio for two names and the required score.
 
         This function determines the token set ratio for two names p_i and p_j, and the required score,
-        depending on what kind of names they are.
+        depending on what kind of names they are. Token set ratios below the required score are returned as 0.
 
         Note: The required scores for different name cases is chosen based on experience.
 
@@ -64,7 +105,7 @@ class NameAnalysis:
             token_set_ratio, req_score (tuple): A tuple containing the token set ratio (TSR) as an integer, and the
                 required score (req_score) as an integer.
         """
-        token_set_ratio = fuzz.token_set_ratio(p_i, p_j)
+        token_set_ratio = None
 
         # if the second name is only one word
         if len(p_j.split()) == 1:
@@ -75,24 +116,26 @@ class NameAnalysis:
             req_score = 90
 
         # if one name contains initials, try to abbreviate the other one with up to
-        # the same number of initials and then compare
-        elif p_i.count('.') >= 1:
-            tsr = np.array(0)
-            for n_initials in range(1, p_i.count('.') + 1):
-                tsr = np.append(tsr, fuzz.token_set_ratio(p_i, NameAnalysis.abbreviate(p_j, n_initials)))
-            token_set_ratio = max(tsr)
-            req_score = 95
-
-        elif p_j.count('.') >= 1:
-            tsr = np.array(0)
-            for n_initials in range(1, p_j.count('.') + 1):
-                tsr = np.append(tsr, fuzz.token_set_ratio(NameAnalysis.abbreviate(p_i, n_initials), p_j))
-            token_set_ratio = max(tsr)
+        # the same number of initials and then compare. Only ratios exceeding the best ratio
+        # so far are of interest, and a perfect match cannot be improved upon.
+        elif p_i.count('.') >= 1 or p_j.count('.') >= 1:
             req_score = 95
+            initials, full_name = (p_i, p_j) if p_i.count('.') >= 1 else (p_j, p_i)
+            token_set_ratio = 0
+            for n_initials in range(1, initials.count('.') + 1):
+                abbreviation = NameAnalysis.abbreviate(full_name, n_initials)
+                token_set_ratio = max(token_set_ratio,
+                                      NameAnalysis.token_set_ratio(initials, abbreviation,
+                                                                   max(req_score, token_set_ratio)))
+                if token_set_ratio == 100:
+                    break
 
         # if name is normal
         else:
             req_score = 90
+
+        if token_set_ratio is None:
+            token_set_ratio = NameAnalysis.token_set_ratio(p_i, p_j, req_score)
         return token_set_ratio, req_score
 
     @staticmethod
@@ -104,7 +147,7 @@ class NameAnalysis:
         1. Define empty lists 'p', and 'p_remove'.
         2. For each name in a list of names ('persons'), check if the lowecsed name contains a title
             and perform the following steps.
-        - If it does contain a title, remove the title.
+        - If it does contain a title, remove the title. All titles are removed in a single scan of the name.
         - If the (remaining) name is longer than 1 letter, add it to the list 'p'
         - If it does not, add it to the list p_remove
 
@@ -119,10 +162,7 @@ class NameAnalysis:
         p_remove = []
 
         for per in persons:
-            name = per.lower()
-            for title in Titles.titles:
-                if title in name:
-                    name = name.replace(title, '')
+            name = TITLES.sub('', per.lower())
             if len(re.sub('[^a-zA-Z]', '', name)) > 1:
                 p.extend([name])
             else:
@@ -164,7 +204,34 @@ class NameAnalysis:
         return names
 
     @staticmethod
-    def find_similar_names(persons: list):
+    def remove_duplicate_lists(names_lists: list):
+        """Remove lists of names that are contained in an earlier list.
+
+        Each list of names is converted to a frozenset once. A list is only kept if its set of names is not a subset
+        of one of the sets that were kept before it, which is equivalent to comparing it to all earlier lists, as
+        subsets are transitive. Exact duplicates of a kept list are skipped with a single hash lookup.
+
+        Args:
+            names_lists (list): a list of lists of names (str)
+
+        Returns:
+            kept (list): the input list without the lists that are contained in an earlier list
+        """
+        kept = []
+        kept_sets = []
+        seen = set()
+        for names in names_lists:
+            names_set = frozenset(names)
+            if names_set in seen:
+                continue
+            if not any(names_set <= kept_set for kept_set in kept_sets):
+                kept.append(names)
+                kept_sets.append(names_set)
+                seen.add(names_set)
+        return kept
+
+    @staticmethod
+    def find_similar_names(persons: list):  # pylint: disable=too-many-locals
         """Find similar names and group them together.
 
         This function takes a list of persons' names as input and returns a list of lists,
@@ -175,7 +242,10 @@ class NameAnalysis:
         2. Filters out the removed names from the original list.
         3. Iterates through the filtered list of input names to find matches and group similar names together.
         Names consisting of one term, are not matched.
-        - For each set input name, calculate the token set ratio (TSR) and the required score by calling 'get_tsr'.
+        - The TSR of all pairs of names is calculated at once, using all available cores. The required score is 100
+        if the second name consists of one term, and 90 otherwise.
+        - If only one of two names contains initials, the TSR and required score are instead determined by 'get_tsr',
+        which compares the name with initials to abbreviations of the other name.
         - If the TSR meets or exceeds the required score, the names are considered similar and grouped together.
         - Sort the list of similar names using the 'sort_select_name' function.
         4. Duplicate lists of names are removed to avoid redundant grouping.
@@ -190,6 +260,13 @@ class NameAnalysis:
         p, p_remove = NameAnalysis.strip_names_from_title(persons)
         persons = [n for n in persons if n not in p_remove]
 
+        # calculate the token set ratios of all pairs of names in parallel, scores below 90 are not needed
+        scores = np.round(process.cdist(p, p, scorer=fuzz.token_set_ratio, processor=process_name,
+                                        score_cutoff=89.5, workers=-1))
+        one_term = np.array([len(name.split()) == 1 for name in p], dtype=bool)
+        has_initials = np.array([name.count('.') >= 1 for name in p], dtype=bool)
+        req_scores = np.where(one_term, 100, 90)
+
         # loop through list of input names to find matches
         for i, sn in enumerate(persons):
             same_name = [sn]
@@ -200,28 +277,32 @@ class NameAnalysis:
             if (len(p[i].split()) == 1):
                 outnames.append(same_name)
                 continue
+            candidates = np.ones(len(p), dtype=bool)
+            candidates[i] = False
+
+            # check if required score is exceeded, using abbreviations if only one name contains initials
+            abbreviate = candidates & ~one_term & (has_initials != has_initials[i])
+            similar = candidates & ~abbreviate & (scores[i] >= req_scores)
+            for j in np.flatnonzero(abbreviate):
+                token_set_ratio, req_score = NameAnalysis.get_tsr(p[i], p[j])
+                similar[j] = token_set_ratio >= req_score
+
             for j, j_names in enumerate(persons):
-                if i != j:
-                    token_set_ratio, req_score = NameAnalysis.get_tsr(p[i], p[j])
-                    # check if required score is exceeded
-                    if token_set_ratio >= req_score:
-                        same_name.extend([j_names])
+                if similar[j]:
+                    same_name.extend([j_names])
                 same_name = NameAnalysis.sort_select_name(same_name)
             outnames.append(same_name)
         outnames.sort(key=len, reverse=True)
 
         # remove duplicate lists of names
-        for i in range(len(outnames)-1, -1, -1):
-            if any(all(elem in names for elem in outnames[i]) for names in outnames[0:i]):
-                outnames.pop(i)
-        return outnames
+        return NameAnalysis.remove_duplicate_lists(outnames)
 
     def find_duplicate_persons(self):
         """Find duplicate names.
 
         From a list of names, find which names represent different writings of the same name,
         e.g. James Brown and J. Brown. Returns a list consisting of sublists, in which each sublist
-        contains all versions of the same name. The token_set_ratio from the fuzzywuzzy package is
+        contains all versions of the same name. The token_set_ratio from the rapidfuzz package is
         used to determine how close to names are. Names are stripped from any titles, and when
         comparing two names where one contains initials (i.e. James Brown versus J. Brown), the first
         name is abbreviated to try to determine the initials.
@@ -239,9 +320,10 @@ class NameAnalysis:
         # check if the longest item in a list is in multiple sublists
         # which might mess things up, so in that case remove and restart
         was_true = False
+        n_occurrences = Counter(itertools.chain.from_iterable(outnames))
         for sublist in outnames:
             longest_name = max(sublist, key=len)
-            if list(itertools.chain.from_iterable(outnames)).count(longest_name) > 1:
+            if n_occurrences[longest_name] > 1:
                 was_true = True
                 try:
                     persons.remove(longest_name)
@@ -251,17 +333,8 @@ class NameAnalysis:
             outnames = NameAnalysis.find_similar_names(persons)
 
         # remove items that appear in multiple sublists
-        outlist = []
-        for j, o_names in enumerate(outnames):
-            x = o_names
-            for restlist in (outnames[:j] + outnames[j+1:]):
-                if any(elem in o_names for elem in restlist):
-                    x = [k for k in o_names if k not in restlist]
-            outlist.append(x)
+        n_sublists = Counter(name for o_names in outnames for name in set(o_names))
+        outlist = [[k for k in o_names if n_sublists[k] == 1] for o_names in outnames]
 
         # remove duplicate lists of names again
-        for i in range(len(outlist)-1, -1, -1):
-            if any(all(elem in names for elem in outlist[i]) for names in outlist[0:i]):
-                outlist.pop(i)
-
-        return outlist
+        return NameAnalysis.remove_duplicate_lists(outlist)
@@ -1,20 +1,80 @@
 """This file contains functions that are used by exxtract_related_orgs to determine wether the found orgs are true orgs."""
 import re
+from collections import Counter
+from functools import lru_cache
+import ahocorasick
 import numpy as np
+from .determinejobs import is_word_boundary
 from .keywords import Org_Keywords
 
 
+REGEX_SPECIAL = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def build_automaton(keywords: list):
+    """Build an Aho-Corasick automaton that finds any of the (literal) keywords in a text."""
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+# false keywords: the literal ones are all searched for at once, the others are regular expressions
+FALSE_KEYS_AUTOMATON = build_automaton([kw for kw in Org_Keywords.false_keys if not REGEX_SPECIAL.search(kw)])
+FALSE_KEYS_RE = [re.compile(kw) for kw in Org_Keywords.false_keys if REGEX_SPECIAL.search(kw)]
+
+# orgs that are 'false' keywords as a whole
+FALSE_KEYS_S = frozenset(Org_Keywords.false_keys_s)
+
+# ORG entities found by NER in standalone org names, per pipeline and org name, and the maximum number of cached names
+NER_ORGS_CACHE = {}
+NER_ORGS_CACHE_SIZE = 4096
+
+
+def strip_prefixes(org: str, patterns: list, any_pattern: re.Pattern):
+    """Strip the patterns, that are anchored at the start, in turn off org.
+
+    The patterns are only applied one by one if 'any_pattern', the alternation of all patterns, matches at the start
+    of org, or if org starts with whitespace. Otherwise none of the patterns would change org.
+    """
+    if org[:1].isspace() or any_pattern.match(org):
+        for pattern in patterns:
+            org = pattern.sub('', org).lstrip()
+    return org
+
+
+def strip_suffixes(org: str, patterns: list, any_pattern: re.Pattern):
+    """Strip the patterns, that are anchored at the end, in turn off org.
+
+    The patterns are only applied one by one if 'any_pattern', the alternation of all patterns, matches at the end
+    of org, or if org ends with whitespace. Otherwise none of the patterns would change org.
+    """
+    if org[-1:].isspace() or any_pattern.search(org):
+        for pattern in patterns:
+            org = pattern.sub('', org).rstrip()
+    return org
+
+
 class OrganisationExtraction:
     """This class contains functions used to perform checks on potential organisations.
 
     It contains the functions:
     - keyword_check
+    - cached_keyword_check
+    - false_keyword_check
     - check_single_orgs
     - individual_org_check
+    - ner_orgs
+    - bulk_ner_orgs
     - percentage_considered_org
     - strip_function_of_entity
     - count_number_of_mentions
+    - remove_hyphens
+    - count_all_mentions
     - part_of_other
+    - count_word_mentions
+    - clear_document_caches
     """
 
     def __init__(self, nlp = None, doc = None, org: str = None,  # pylint: disable=too-many-arguments'
@@ -33,7 +93,9 @@ class OrganisationExtraction:
         """Check if org is likely to be or not be an organisation based on keywords.
 
         This function contains a decision tree that determines if it is likely that a candidate organisation is a
-        true orginasation, taking into account the presence of 'organisational' keywords.
+        true orginasation, taking into account the presence of 'organisational' keywords. Each list of keywords is
+        only checked keyword by keyword if any of its keywords is found, which is checked with a single regular
+        expression.
 
         Args:
             final (bool): The current decision status.
@@ -48,29 +110,63 @@ class OrganisationExtraction:
         if not org:
             org = self.org
 
+        lower_org = org.lower()
+
         # decision is true if org contains a keyword, unless org is only a keyword
-        for kw in Org_Keywords.true_keys:
-            if len(re.findall(kw, org.lower())) > 0:
-                final = True
-                if len(org) == len(kw):
-                    final = False
+        if Org_Keywords.true_keys_any_re.search(lower_org):
+            for kw, kw_re in zip(Org_Keywords.true_keys, Org_Keywords.true_keys_re):
+                if kw_re.search(lower_org):
+                    final = True
+                    if len(org) == len(kw):
+                        final = False
 
         # potential decision update: true if org contains a keyword as standalone word, unless it is the only word
-        for kw in Org_Keywords.true_keys_cap:
-            if len(re.findall((r"\b" + kw + r"\b"), org)) > 0:
-                final = True
-                if len(org) == len(kw):
-                    final = False
+        if Org_Keywords.true_keys_cap_any_re.search(org):
+            for kw, kw_re in zip(Org_Keywords.true_keys_cap, Org_Keywords.true_keys_cap_re):
+                if kw_re.search(org):
+                    final = True
+                    if len(org) == len(kw):
+                        final = False
 
         # decision is still false if the org contains a 'false' keyword, a keyword indicating that the name is not an org
-        if final is True:
-            for kw in Org_Keywords.false_keys:
-                if len(re.findall(kw, org.lower())) > 0:
-                    final = False
-            if org.lower() in Org_Keywords.false_keys_s:
-                final = False
+        if final is True and OrganisationExtraction.false_keyword_check(org, lower_org):
+            final = False
         return final
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def cached_keyword_check(org: str):
+        """Apply keyword_check to org, without an initial decision status.
+
+        The results are cached per org, as the same orgs are checked over and over by 'part_of_other'.
+
+        Args:
+            org (str): The orginasation name to be checked for keyword presence.
+
+        Returns:
+            bool: The decision status based on keyword presence, None if no keyword decided on it.
+        """
+        return OrganisationExtraction().keyword_check(final=False, org=org)
+
+    @staticmethod
+    def false_keyword_check(org: str, lower_org: str = None):
+        """Check if org contains a 'false' keyword, or is a 'false' keyword, indicating that the name is not an org.
+
+        If this is the case, 'keyword_check' never considers org to be an organisation.
+
+        Args:
+            org (str): The orginasation name to be checked for keyword presence.
+            lower_org (str, optional): The lowercased org, if already available.
+
+        Returns:
+            bool: True if org contains a 'false' keyword or is a 'false' keyword.
+        """
+        if lower_org is None:
+            lower_org = org.lower()
+        return (next(FALSE_KEYS_AUTOMATON.iter(lower_org), None) is not None or
+                any(kw_re.search(lower_org) for kw_re in FALSE_KEYS_RE) or
+                lower_org in FALSE_KEYS_S)
+
     def check_single_orgs(self):
         """Append org to true list if it passes the keyword check and is not part of other org.
 
@@ -101,7 +197,10 @@ class OrganisationExtraction:
 
         This function checks if an orginasations 'o' in the list orgs is part of the input 'org'.
         If it is and the matching 'o' has enough characters, is common enough in the analysed test,
-        and it is not the cases that the only difference is the presence of a keyword org, return True
+        and it is not the cases that the only difference is the presence of a keyword org, return True.
+        The number of mentions and the keyword check of each 'o' are cached by 'count_word_mentions' and
+        'cached_keyword_check', as the same orgs are checked for each new org. The check stops at the first 'o'
+        that is found to be part of 'org'.
 
         Args:
             orgs: list of organisations
@@ -111,25 +210,39 @@ class OrganisationExtraction:
         Returns:
             is_part (bool): returns true if a member of orgs in a part of org.
         """
-        oe = OrganisationExtraction()
-        is_part = False
-
         for o in orgs:
             if org != o and o in org and len(o) > 5:
-                n_orgs = len(re.findall(r"\b" + o + r"\b", doc.text))
+                n_orgs = OrganisationExtraction.count_word_mentions(o, doc.text)
                 if n_orgs > 5:
-                    kw_final = False
-                    kw_o = oe.keyword_check(final=kw_final, org=o)
-                    kw_org = oe.keyword_check(final=kw_final, org=org)
+                    kw_o = OrganisationExtraction.cached_keyword_check(o)
+                    kw_org = OrganisationExtraction.cached_keyword_check(org)
                     if not (kw_o is False and kw_org is True):
-                        is_part = True
-        return is_part
+                        # a single match is enough, the remaining orgs do not need to be checked
+                        return True
+        return False
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def count_word_mentions(org: str, text: str):
+        """Count the number of mentions of org as a whole word in the text.
+
+        The results are cached per org and text, for the document that is processed: the cache is cleared by
+        'clear_document_caches' when a document is done, so that no texts of earlier documents are kept.
+
+        Args:
+            org (str): The orgination name to count the mentions of.
+            text (str): The text in which to look for the org.
+
+        Returns:
+            n_counts (int): number of mentions found.
+        """
+        return len(re.findall(r"\b" + org + r"\b", text))
 
     def individual_org_check(self):
         """Check if org term individually is considered an NER ORG.
 
         Check if an potential ORG is considered and ORG if just that name is analysed by Stanza NER.
-        (Without the context of any sentences)
+        (Without the context of any sentences). The NER results are cached by 'ner_orgs'.
 
         Args:
             org (str): The orgination name to be checked for keyword presence.
@@ -139,12 +252,53 @@ class OrganisationExtraction:
             is_org(bool): true if the test passes
         """
         org = self.org
-        doc_o = self.nlp(org)
-        o_t = [f'{ent.text}' for ent in doc_o.ents if ent.type == "ORG"]
+        o_t = OrganisationExtraction.ner_orgs(self.nlp, org)
         is_org = bool(len(o_t) == 1 and org in o_t)
         return is_org
 
-    def percentage_considered_org(self):
+    @staticmethod
+    def ner_orgs(nlp, org: str):
+        """Determine the ORG entities found by Stanza NER in an org name.
+
+        The results are cached per pipeline and org name, as the same candidate organisations are often checked
+        multiple times, both within a document and across documents. The cache can be filled for multiple
+        org names at once with 'bulk_ner_orgs'.
+
+        Args:
+            nlp (stanza.pipeline): the stanza pipeline used to analyse texts
+            org (str): The orgination name to be analysed.
+
+        Returns:
+            o_t (tuple): the texts of the ORG entities found in org
+        """
+        if (nlp, org) not in NER_ORGS_CACHE:
+            OrganisationExtraction.bulk_ner_orgs(nlp, [org])
+        return NER_ORGS_CACHE[(nlp, org)]
+
+    @staticmethod
+    def bulk_ner_orgs(nlp, orgs: list):
+        """Determine the ORG entities found by Stanza NER in multiple org names, and cache them for 'ner_orgs'.
+
+        The org names that are not cached yet are analysed in a single bulk call of the pipeline, instead of
+        one call per org name. The oldest cached org names are removed if the cache exceeds its maximum size.
+
+        Args:
+            nlp (stanza.pipeline): the stanza pipeline used to analyse texts
+            orgs (list): The orgination names to be analysed.
+        """
+        todo = list(dict.fromkeys(org for org in orgs if (nlp, org) not in NER_ORGS_CACHE))
+        if len(todo) == 1:
+            docs = [nlp(todo[0])]
+        elif todo:
+            docs = nlp.bulk_process(todo)
+        else:
+            docs = []
+        for org, doc_o in zip(todo, docs):
+            NER_ORGS_CACHE[(nlp, org)] = tuple(f'{ent.text}' for ent in doc_o.ents if ent.type == "ORG")
+        while len(NER_ORGS_CACHE) > NER_ORGS_CACHE_SIZE:
+            del NER_ORGS_CACHE[next(iter(NER_ORGS_CACHE))]
+
+    def percentage_considered_org(self, n_orgs: int = None):
         """Determine the percenatge of mention cases for which the org was considered an NER ORG.
 
         This function identifies all mentions of the org within the text. Then calculate in what percentage of the
@@ -153,7 +307,10 @@ class OrganisationExtraction:
         Args:
             doc: stanza processed text in which to look for organisations.
             org (str): The orgination name to be checked for keyword presence.
-            orgs (np.array): array of organisations
+            orgs (np.array or Counter): array of organisations, with the number of times each of them was
+                identified as org in 'counts', or a Counter of the number of times each organisation was identified.
+            n_orgs (int, optional): the number of mentions of org within the text, if already counted (e.g. with
+                'count_all_mentions'). Counted with 'count_number_of_mentions' if not provided.
 
         Returns:
             percentage(float): percentage of cases in which org was identified as org
@@ -161,10 +318,14 @@ class OrganisationExtraction:
         """
         org = self.org
         orgs = self.orgs
-        n_orgs = self.count_number_of_mentions(org=org)
+        if n_orgs is None:
+            n_orgs = self.count_number_of_mentions(org=org)
 
         if n_orgs >= 1 and org in orgs:
-            n_orgs_found = self.counts[orgs == org][0]
+            if isinstance(orgs, Counter):
+                n_orgs_found = orgs[org]
+            else:
+                n_orgs_found = self.counts[orgs == org][0]
             percentage = n_orgs_found/float(n_orgs)*100.
         elif org in orgs:
             percentage = -10
@@ -176,6 +337,8 @@ class OrganisationExtraction:
         """Strip the work roles of an potential org.
 
         This function removes terms indicating a persons role within a organisation off the organisation's name.
+        Each list of keywords is only applied term by term if any of its terms is found, which is checked with a
+        single regular expression.
 
         Example: if fed with
         "Lid van de Raad van Advies bij Bedrijfsnaam", only "Bedrijfsnaam" would be returned.
@@ -187,33 +350,18 @@ class OrganisationExtraction:
             org (str): The orgination name from which the role is removed if found.
         """
         org = self.org
-
-        for p in Org_Keywords.position:
-            org = re.sub('^' + p + r"\b", '', org, flags=re.IGNORECASE).lstrip()
-
-        for lv in Org_Keywords.lidwoord_voorzetsels:
-            org = re.sub('^' + lv, '', org).lstrip()
-
-        for p in Org_Keywords.position:
-            org = re.sub('^' + p + r"\b", '', org, flags=re.IGNORECASE).lstrip()
-
-        for lv in Org_Keywords.lidwoord_voorzetsels:
-            org = re.sub('^' + lv, '', org).lstrip()
-
-        for r in Org_Keywords.raad:
-            org = re.sub('^' + r + r"\b", '', org, flags=re.IGNORECASE).lstrip()
-
-        for lv in Org_Keywords.lidwoord_voorzetsels:
-            org = re.sub('^' + lv, '', org).lstrip()
-
-        for c in Org_Keywords.commissie:
-            org = re.sub('^' + c + r"\b", '', org, flags=re.IGNORECASE).lstrip()
-
-        for lv in Org_Keywords.lidwoord_voorzetsels:
-            org = re.sub('^' + lv, '', org).lstrip()
-
-        for f in Org_Keywords.functies:
-            org = re.sub(f + '$', '', org, flags=re.IGNORECASE).rstrip()
+        position = Org_Keywords.position_re, Org_Keywords.position_any_re
+        lidwoord_voorzetsels = Org_Keywords.lidwoord_voorzetsels_re, Org_Keywords.lidwoord_voorzetsels_any_re
+
+        org = strip_prefixes(org, *position)
+        org = strip_prefixes(org, *lidwoord_voorzetsels)
+        org = strip_prefixes(org, *position)
+        org = strip_prefixes(org, *lidwoord_voorzetsels)
+        org = strip_prefixes(org, Org_Keywords.raad_re, Org_Keywords.raad_any_re)
+        org = strip_prefixes(org, *lidwoord_voorzetsels)
+        org = strip_prefixes(org, Org_Keywords.commissie_re, Org_Keywords.commissie_any_re)
+        org = strip_prefixes(org, *lidwoord_voorzetsels)
+        org = strip_suffixes(org, Org_Keywords.functies_re, Org_Keywords.functies_any_re)
         return org
 
     def count_number_of_mentions(self, org: str = None, doc = None):
@@ -232,7 +380,72 @@ class OrganisationExtraction:
             doc = self.doc
 
         if '-' not in org:
-            n_counts = len(re.findall(r"\b" + org + r"\b", doc.text.replace('-', '')))
+            n_counts = OrganisationExtraction.count_word_mentions(org, OrganisationExtraction.remove_hyphens(doc.text))
         else:
-            n_counts = len(re.findall(r"\b" + org + r"\b", doc.text))
+            n_counts = OrganisationExtraction.count_word_mentions(org, doc.text)
         return n_counts
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def remove_hyphens(text: str):
+        """Remove the hyphens from a text.
+
+        The results are cached for the last few texts, as the same text is used to count the mentions of many orgs.
+        Like that of 'count_word_mentions', the cache is cleared by 'clear_document_caches'.
+
+        Args:
+            text (str): The text from which to remove the hyphens.
+
+        Returns:
+            text (str): The text without hyphens.
+        """
+        return text.replace('-', '')
+
+    @staticmethod
+    def clear_document_caches():
+        """Clear the caches of 'count_word_mentions' and 'remove_hyphens', which are keyed on the text of a document.
+
+        These caches only give hits within a document, so they are cleared once a document is processed, so that
+        they do not keep the texts of all documents processed before alive.
+        """
+        OrganisationExtraction.count_word_mentions.cache_clear()
+        OrganisationExtraction.remove_hyphens.cache_clear()
+
+    @staticmethod
+    def count_all_mentions(orgs: list, doc):
+        """Count the number of mentions of each org in the text, taking into account word boundaries.
+
+        The result is the same as that of 'count_number_of_mentions' for each org, but the text is scanned once
+        for all orgs using an Aho-Corasick automaton, and once more for orgs containing a hyphen. Orgs that contain
+        characters with a special meaning in regular expressions are counted with 'count_number_of_mentions'.
+
+        Args:
+            orgs (list): The orgination names to count the mentions of.
+            doc: stanza processed text in which to look for organisations.
+
+        Returns:
+            n_counts (list): number of mentions found for each org.
+        """
+        literal_orgs = {org for org in orgs if org and not REGEX_SPECIAL.search(org)}
+        counts = dict.fromkeys(literal_orgs, 0)
+
+        for hyphenated, text in ((False, OrganisationExtraction.remove_hyphens(doc.text)), (True, doc.text)):
+            automaton = ahocorasick.Automaton()
+            for org in literal_orgs:
+                if ('-' in org) == hyphenated:
+                    automaton.add_word(org, org)
+            if len(automaton) == 0:
+                continue
+            automaton.make_automaton()
+
+            # like re.findall, mentions of the same org do not overlap
+            org_end = {}
+            for end, org in automaton.iter(text):
+                start = end - len(org) + 1
+                if (start >= org_end.get(org, 0) and is_word_boundary(text, start)
+                        and is_word_boundary(text, end + 1)):
+                    org_end[org] = end + 1
+                    counts[org] += 1
+
+        extraction = OrganisationExtraction(doc=doc)
+        return [counts[org] if org in counts else extraction.count_number_of_mentions(org=org) for org in orgs]
@@ -1,8 +1,11 @@
 """Unit tests for the file /extract_pdf/classify_organisations."""
 import os
+import tempfile
 import unittest
 import pandas as pd
+from joblib import dump
 from nedextract.classify_organisation import file_to_pd
+from nedextract.classify_organisation import load_classifier
 from nedextract.classify_organisation import train
 
 
@@ -18,6 +21,7 @@ class TestClassifyOrganisations(unittest.TestCase):
       performs some preprocssing steps
     - test_train: tests the train function which trains a Multinomial Naive Bayes
       classifier to classify texts into main sector categories.
+    - test_load_classifier: tests the load_classifier function that loads and caches the saved classifier files.
     """
 
     def test_file_to_pd(self):
@@ -55,3 +59,23 @@ class TestClassifyOrganisations(unittest.TestCase):
         df = file_to_pd(inputfile)
         label = train(df, 0.99, 0.99, False)[1]
         assert label == 'Natuur'
+
+    def test_load_classifier(self):
+        """Unit test function for the 'load_classifier' function.
+
+        This function tests that 'load_classifier' loads the three saved files, that the loaded objects are reused
+        when the files have not been modified, and that the files are loaded again when they have been modified.
+
+        Raises:
+            AssertionError: If any of the assert statements fail, indicating incorrect return values.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = [os.path.join(tmpdir, name + '.joblib') for name in ('clf', 'labels', 'vector')]
+            for i, file in enumerate(files):
+                dump([i], file)
+            loaded = load_classifier(*files, (1, 1, 1))
+            self.assertEqual(loaded, ([0], [1], [2]))
+            self.assertIs(load_classifier(*files, (1, 1, 1)), loaded)
+
+            dump(['new'], files[0])
+            self.assertEqual(load_classifier(*files, (2, 1, 1)), (['new'], [1], [2]))
@@ -1,6 +1,7 @@
 """This module contains unit tests for the functions in extract_persons."""
 import os
 import unittest
+from types import SimpleNamespace
 import numpy as np
 import stanza
 from nedextract.extract_persons import append_p_position
@@ -55,6 +56,8 @@ class TestExtractPersons(unittest.TestCase):
     Test methods:
         - test_identify_potential_people: tests the 'identify_potential_people' function that analyses text to find names of
           people that may have one of the predifined jobs.
+        - test_identify_potential_people_photographer: tests that names of photographers are removed by
+          'identify_potential_people', matching the names literally.
         - test_extract_persons: tests the 'extract_persons' function that extracts ambassadors and board members from a text
           using a rule-based method.
         - test_director_check: tests the director_check function that performs checks for potential directors and update their
@@ -89,6 +92,21 @@ class TestExtractPersons(unittest.TestCase):
         self.assertTrue(isinstance(people, list))
         self.assertEqual(people.sort(), expected.sort())
 
+    def test_identify_potential_people_photographer(self):
+        """Unit test for the removal of photographers by the function 'identify_potential_people'.
+
+        A name that is found after a copyright sign is removed as the name of a photographer. The name is matched
+        literally: the dots in 'A.B. de Wit' only match dots, so 'AxBx de Wit' is not considered the same photographer.
+
+        Raises:
+            AssertionError: if the returned parameter does not match the expected value
+        """
+        sentence = SimpleNamespace(text='Voorzitter van het bestuur is A.B. de Wit.',
+                                   ents=[SimpleNamespace(text='A.B. de Wit', type='PER')])
+        for credit, expected in (('Foto: © AxBx de Wit', [['A.B. de Wit']]), ('Foto: © A.B. de Wit', [])):
+            doc_p = SimpleNamespace(sentences=[sentence], text=f'{sentence.text} {credit}')
+            self.assertEqual(identify_potential_people(doc_p, ['A.B. de Wit']), expected)
+
     def test_extract_persons(self):
         """Unit test for the function 'extract_persons'.
 
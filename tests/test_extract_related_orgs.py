@@ -3,20 +3,26 @@
 Functions:
 - test_collect_orgs
 - test_decide_org
+- test_individual_check_needed
 - test_match_anbis
 - test_apply_matching
+- test_matching_lookup
 """
 
 import os
 import unittest
+from unittest import mock
 import numpy as np
 import pandas as pd
 import stanza
 from nedextract.extract_related_orgs import apply_matching
 from nedextract.extract_related_orgs import collect_orgs
 from nedextract.extract_related_orgs import decide_org
+from nedextract.extract_related_orgs import individual_check_needed
 from nedextract.extract_related_orgs import match_anbis
+from nedextract.extract_related_orgs import matching_lookup
 from nedextract.preprocessing import preprocess_pdf
+from nedextract.utils.orgs_checks import OrganisationExtraction
 
 
 # Define test text
@@ -35,9 +41,13 @@ class TestExtractRelatedOrgas(unittest.TestCase):
     - test_collect_orgs: tests the function collect organisations that collects organisations that are mentioned in text
     - test_decide_org: tests the function decide_orgs that defines a decision tree to determine if a mentioned organisations
       is likely a true organisation
+    - test_individual_check_needed: tests the function individual_check_needed that determines if decide_org needs to
+      check the standalone organisation with NER
     - test_match_anbis: Tests the match anbis function that tries to match found organisations with info about known anbis
     - test_apply_matching: tests the apply_matching function that tries to match a name with values in
       one of two provided columns in a dataframe
+    - test_matching_lookup: tests the matching_lookup function that creates a lookup of the values in two
+      provided columns in a dataframe
     """
 
     def test_collect_orgs(self):
@@ -45,7 +55,7 @@ class TestExtractRelatedOrgas(unittest.TestCase):
 
         Function that tests the collect_orgs function that collects organisations that are mentioned in a text using stanza NER
         with a number of postprocessing steps. One test case is applied, that tests if the expected organisations are
-        returned from a test file.
+        returned from a test file. It also tests that the cached mentions are cleared when a check fails.
 
         Raises:
             AssertionError: If any of the assert statement fails, indicating incorrect return values.
@@ -53,13 +63,20 @@ class TestExtractRelatedOrgas(unittest.TestCase):
         orgs = collect_orgs(infile, nlp)
         self.assertEqual(orgs, ['Bedrijf2', 'Bedrijf3'])
 
+        # the cached mentions of the document are also cleared if a check fails
+        OrganisationExtraction.count_word_mentions('Bedrijf2', doc.text)
+        with mock.patch.object(OrganisationExtraction, 'count_all_mentions', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                collect_orgs(infile, nlp)
+        self.assertEqual(OrganisationExtraction.count_word_mentions.cache_info().currsize, 0)
+
     def test_decide_org(self):
         """Unit test for the function decide_org.
 
         Function that tests the function decide_orgs that defines a decision tree to determine if a mentioned organisations
         is likely a true organisation.
 
-        Nine assertion tests are defined that test for various test names, if the expected result is returned
+        Ten assertion tests are defined that test for various test names, if the expected result is returned
         for different percentage the organisation was found as org, and the total number of times the organisaiont was
         found in the text.
 
@@ -121,6 +138,41 @@ class TestExtractRelatedOrgas(unittest.TestCase):
         final = decide_org(org, pco, org_pp, org_c, nlp)
         self.assertFalse(final, 'maybe')
 
+        # Test case 10
+        pco = ((0, 1), (100, 1))
+        org = 'Bedrijf'
+        org_pp = np.array(['Bedrijf'])
+        org_c = np.array(['Andere stichting'])
+        final = decide_org(org, pco, org_pp, org_c, nlp)
+        self.assertEqual(final, 'no')
+
+    def test_individual_check_needed(self):
+        """Unit test for the function individual_check_needed.
+
+        Function that tests the function individual_check_needed that determines if the decision tree of decide_org
+        checks whether the standalone organisation is considered an organisation by NER.
+
+        There are four test cases, for different percentages and numbers of mentions, and organisations found
+        with preprocessing methods 1 and 3.
+
+        Returns:
+            AssertionError: If any of tests does not returns the expected retult.
+        """
+        org = 'Bedrijf'
+        org_c = np.array(['Bedrijf'])
+
+        # Test case 1: decided on number of mentions and percentages only
+        self.assertFalse(individual_check_needed(org, ((50, 6), (50, 6)), np.array(['Bedrijf']), org_c))
+
+        # Test case 2: found with preprocessing method 3, which is sufficient
+        self.assertFalse(individual_check_needed(org, ((100, 1), (100, 1)), np.array(['Bedrijf']), org_c))
+
+        # Test case 3: not found with preprocessing method 3
+        self.assertTrue(individual_check_needed(org, ((0, 1), (100, 1)), np.array(['Andere']), org_c))
+
+        # Test case 4: not mentioned, but found with preprocessing method 3
+        self.assertTrue(individual_check_needed(org, ((0, 0), (0, 0)), np.array(['Bedrijf']), org_c))
+
     def test_match_anbis(self):
         """Unit test for the match_anbis function.
 
@@ -175,3 +227,20 @@ class TestExtractRelatedOrgas(unittest.TestCase):
         o_m = apply_matching(df, m, 'currentStatutoryName', 'shortBusinessName')
         e_m = 'Stichting B1 b.v.'
         self.assertEqual(o_m, e_m)
+
+    def test_matching_lookup(self):
+        """Unit test for the matching_lookup function.
+
+        This function tests the matching_lookup function that creates a lookup of the values in two provided columns
+        in a dataframe, using their lowercased version as key.
+
+        There is one test case with a missing value and two values with the same lowercased version, of which the
+        first in sorted order is expected to be kept.
+        """
+        df = pd.DataFrame({'currentStatutoryName': ['Bedrijf1', 'bedrijf1'],
+                           'shortBusinessName': ['Stichting B1 b.v.', None]})
+        lookup = matching_lookup(df, 'currentStatutoryName', 'shortBusinessName')
+        e_lookup = {'bedrijf1': (0, 'Bedrijf1'), 'stichting b1 b.v.': (1, 'Stichting B1 b.v.')}
+        self.assertEqual(lookup, e_lookup)
+        self.assertEqual(apply_matching(df, 'B1 B.V.', 'currentStatutoryName', 'shortBusinessName', lookup),
+                         'Stichting B1 b.v.')
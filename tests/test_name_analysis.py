@@ -18,6 +18,7 @@ class TestExtractPersons(unittest.TestCase):
         - test_strip_names_from_title: tests the 'strip_names_from_title' function that removes titles from names.
         - test_find_duplicate_persons: tests the 'find_duplicate_persons' function that tests if names in a list are very
           similar.
+        - test_find_similar_names: tests the 'find_similar_names' function that groups names based on their TSR.
         - test_surrounding_words: tests the 'surrounding_words' function that dermines the words surrounding a given name in a
           text.
         - test_count_occurrence: tests the 'count_occurrence' function that counts for a list of serach words the occurences in
@@ -82,6 +83,10 @@ class TestExtractPersons(unittest.TestCase):
         tsr5, rs5 = NameAnalysis.get_tsr('Jane Doe', 'J. Doe')
         self.assertEqual(tsr5, 100)
         self.assertEqual(rs5, 95)
+        # Test case 6: non-ASCII characters are removed before scoring, as fuzzywuzzy did
+        tsr6, rs6 = NameAnalysis.get_tsr('Hélène Bakker', 'Helene Bakker')
+        self.assertEqual(tsr6, 92)
+        self.assertEqual(rs6, 90)
 
     def test_strip_names_from_title(self):
         """Unit test for the 'strip_names_from_titles' funciton.
@@ -120,3 +125,21 @@ class TestExtractPersons(unittest.TestCase):
                     ['Jane White'], ['William Doe']]
         self.assertTrue(isinstance(outnames, list))
         self.assertEqual(outnames, expected)
+
+    def test_find_similar_names(self):
+        """Unit test for the 'find_similar_names' function.
+
+        This function tests that a name and its variant with an initial are grouped, that names below the required
+        score are not grouped, and that names with and without diacritics are grouped.
+
+        Raises:
+            AssertionError: If the returned groups of names do not match the expected return values.
+        """
+        names = ['J. Dijkstra', 'Jan Dijkstra', 'Piet Klaassen']
+        expected = [['Jan Dijkstra', 'J. Dijkstra'], ['Piet Klaassen']]
+        self.assertEqual(NameAnalysis.find_similar_names(names), expected)
+
+        # non-ASCII characters are removed before scoring, as fuzzywuzzy did
+        names = ['Hélène Bakker', 'Helene Bakker', 'Jürgen Müller', 'Jurgen Muller']
+        expected = [['Hélène Bakker', 'Helene Bakker'], ['Jürgen Müller', 'Jurgen Muller']]
+        self.assertEqual(NameAnalysis.find_similar_names(names), expected)
@@ -1,20 +1,47 @@
 """This file contains the unit tests for the preprocessing functions of auto_extract."""
 import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+import stanza
 from nedextract.preprocessing import delete_downloaded_pdf
 from nedextract.preprocessing import download_pdf
+from nedextract.preprocessing import extract_pdf_text
 from nedextract.preprocessing import preprocess_pdf
+from nedextract.preprocessing import process_pdf_variants
 
 
 class UnitTestsPreprocessing(unittest.TestCase):
     """Unit test class for testing functions used to preprocess text.
 
     Contains:
+    - test_extract_pdf_text
     - test_preprocess_pdf
+    - test_process_pdf_variants
     - test_download_pdf
     - test_delete_pdf
     """
 
+    def test_extract_pdf_text(self):
+        """Unit test for the function extract_pdf_text.
+
+        The function tests that the text of a PDF file is extracted once and taken from the cache afterwards, and that
+        the text is extracted again when the file is replaced by another file.
+        """
+        indir = os.path.join(os.getcwd(), 'tests')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            infile = os.path.join(tmpdir, 'report.pdf')
+            shutil.copyfile(os.path.join(indir, 'test_report.pdf'), infile)
+            stat = os.stat(infile)
+            text = extract_pdf_text(infile, stat.st_mtime_ns, stat.st_size)
+            self.assertIsInstance(text, str)
+            self.assertIs(extract_pdf_text(infile, stat.st_mtime_ns, stat.st_size), text)
+
+            shutil.copyfile(os.path.join(indir, 'test_report3.pdf'), infile)
+            stat = os.stat(infile)
+            self.assertNotEqual(extract_pdf_text(infile, stat.st_mtime_ns, stat.st_size), text)
+
     def test_preprocess_pdf(self):
         """Unit test for the function preprocess_pdf.
 
@@ -28,14 +55,55 @@ class UnitTestsPreprocessing(unittest.TestCase):
         text = preprocess_pdf(infile, ', ')
         self.assertIsInstance(text, str)
 
+    def test_process_pdf_variants(self):
+        """Unit test for the function process_pdf_variants.
+
+        The function tests the process_pdf_variants function that preprocesses the text of a PDF file in different ways
+        and applies the stanza pipeline to each of the texts, using a cache directory. The documents read from the
+        cache should be equal to the processed documents, and should be read without applying the pipeline again.
+        A cached document that cannot be read should be processed again. A pipeline with other processors should not
+        use the cached documents.
+        """
+        infile = os.path.join(os.getcwd(), 'tests', 'test_report.pdf')
+        nlp = stanza.Pipeline(lang='nl', processors='tokenize,ner')
+        variants = [{'r_blankline': ', ', 'r_par': ', '}, {'r_blankline': '. ', 'r_eol': '. ', 'r_par': ', '}]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            docs = process_pdf_variants(infile, nlp, variants, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            with mock.patch.object(nlp, 'bulk_process') as bulk_process:
+                cached_docs = process_pdf_variants(infile, nlp, variants, cache_dir)
+            bulk_process.assert_not_called()
+
+            # a cached document that cannot be read is processed again and overwritten
+            cache_file = os.path.join(cache_dir, sorted(os.listdir(cache_dir))[0])
+            with open(cache_file, 'wb') as f:
+                f.write(b'truncated')
+            process_pdf_variants(infile, nlp, variants, cache_dir)
+            with open(cache_file, 'rb') as f:
+                self.assertEqual(stanza.Document.from_serialized(f.read()).text, docs[0].text)
+
+            process_pdf_variants(infile, stanza.Pipeline(lang='nl', processors='tokenize'), variants, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+        for doc, cached_doc, variant in zip(docs, cached_docs, variants):
+            self.assertEqual(doc.text, preprocess_pdf(infile, **variant))
+            self.assertEqual(cached_doc.text, doc.text)
+            self.assertEqual([(ent.text, ent.type) for ent in cached_doc.ents],
+                             [(ent.text, ent.type) for ent in doc.ents])
+
     def test_download_pdf(self):
         """Unit test for the function download_pdf.
 
-        This function tests the download_pdf dunction that downloads a pdf file from an url and safe it in the cwd.
+        This function tests the download_pdf dunction that downloads a pdf file from an url and safe it in the cwd,
+        and clears the cached texts of pdf files.
         """
         url = ("https://github.com/Transparency-in-the-non-profit-sector/nedextract/blob/main/tests/test_report.pdf")
+        infile = os.path.join(os.getcwd(), 'tests', 'test_report.pdf')
+        stat = os.stat(infile)
+        extract_pdf_text(infile, stat.st_mtime_ns, stat.st_size)
         filename = download_pdf(url)
         self.assertTrue(os.path.exists(filename))
+        # a previously downloaded file with the same path, size and modification time is not taken from the cache
+        self.assertEqual(extract_pdf_text.cache_info().currsize, 0)
 
     def test_delete_downloaded_pdf(self):
         """Unit test for the function delete_downloaded_pdf.
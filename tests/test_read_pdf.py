@@ -1,6 +1,7 @@
 """Tests for functions included in read_pdf."""
 import os
 import unittest
+from unittest import mock
 import numpy as np
 import stanza
 from nedextract.preprocessing import preprocess_pdf
@@ -104,11 +105,16 @@ class TestReadPDF(unittest.TestCase):
     Test Methods:
         - test_extract_pdf: Tests the 'extract_pdf' function for information extraction from PDF files using the stanza
           pipeline.
+        - test_extract_pdfs: Tests the 'extract_pdfs' function for information extraction from multiple PDF files at once.
+        - test_extract_pdfs_no_text: Tests that 'extract_pdfs' skips the stanza pipeline for files without text.
         - test_output_people: Tests the 'output_people' function for gathering information about people and structuring the
           output.
+        - test_collect_entities: Tests the 'collect_entities' function to collect the organizations and persons in a
+          stanza processed document.
         - test_ots: Tests the 'ots' function to convert a NumPy array of strings into a backspace-separated string.
         - test_atc: Tests the 'atc' function to split an array into specified columns for output.
         - test_stanza_NL: Tests the 'download_stanza_NL' function to download the Stanza data for the Dutch language.
+        - test_load_pipeline: Tests the 'load_pipeline' function to load the Stanza Dutch pipeline only once.
 
     Each test method contains one or more test cases, and assertions are used to validate the output
     against expected results.
@@ -170,6 +176,51 @@ class TestReadPDF(unittest.TestCase):
         op, _, oo = extractor.extract_pdf(infile2, opd_p, opd_g, opd_o)
         self.assertTrue(np.all(op == e_op2))
 
+    def test_extract_pdfs(self):
+        """Unit test function for the 'extract_pdfs' method.
+
+        The test uses the two predefined test pdf files and asserts that for each of them the output of 'extract_pdfs'
+        matches the output of 'extract_pdf'.
+
+        Raises:
+        AssertionError: If the output for any of the files does not match the output of 'extract_pdf'.
+        """
+        tasks = ['people', 'orgs']
+        extractor = PDFInformationExtractor(tasks, None, None, None)
+        opd_p = np.array([]).reshape(0, 91)
+        opd_g = np.array([]).reshape(0, 3)
+        opd_o = np.array([]).reshape(0, 3)
+        outputs = extractor.extract_pdfs([infile1, infile2], opd_p, opd_g, opd_o)
+        self.assertEqual(len(outputs), 2)
+        for infile, output in zip([infile1, infile2], outputs):
+            e_output = extractor.extract_pdf(infile, opd_p, opd_g, opd_o)
+            for opd, e_opd in zip(output, e_output):
+                self.assertTrue(np.array_equal(opd, e_opd))
+
+    def test_extract_pdfs_no_text(self):
+        """Unit test function for the 'extract_pdfs' method for a file without text.
+
+        The preprocessed text of the test file is replaced by a text without letters or digits, as for a scanned pdf
+        file. The test asserts that the stanza pipeline is not loaded or applied, and that the output consists of
+        an empty people row, sector row and orgs row for the file.
+
+        Raises:
+            AssertionError: If the pipeline is used or the output does not match the empty rows.
+        """
+        extractor = PDFInformationExtractor(['all'], None, None, None)
+        opd_p = np.array([]).reshape(0, 91)
+        opd_g = np.array([]).reshape(0, 3)
+        opd_o = np.array([]).reshape(0, 3)
+        with mock.patch('nedextract.read_pdf.preprocess_pdf', return_value=' , \n '):
+            with mock.patch.object(PDFInformationExtractor, 'load_pipeline') as load_pipeline:
+                outputs = extractor.extract_pdfs([infile1], opd_p, opd_g, opd_o)
+        load_pipeline.assert_not_called()
+        e_p = np.array([['test_report.pdf'] + [''] * 90])
+        e_g = np.array([['test_report.pdf', '', '']])
+        e_o = np.array([['', '', '']])
+        for opd, e_opd in zip(outputs[0], (e_p, e_g, e_o)):
+            self.assertTrue(np.array_equal(opd, e_opd))
+
     def test_ouput_people(self):
         """Unit test function for the output_people method.
 
@@ -187,6 +238,22 @@ class TestReadPDF(unittest.TestCase):
         doc = stanza.Pipeline(lang='nl', processors='tokenize,ner')(text)
         self.assertEqual(extractor.output_people(infile1, doc, 'Bedrijf'), expected_output_people)
 
+    def test_collect_entities(self):
+        """Unit test function for the 'collect_entities' method.
+
+        This function tests that 'collect_entities' counts the mentions of each organization and returns the sorted
+        unique persons of a stanza processed document of the test file 'infile1'.
+
+        Raises:
+            AssertionError: If any of the assert statements fail, indicating incorrect return values.
+        """
+        text = preprocess_pdf(infile1, ' ')
+        doc = stanza.Pipeline(lang='nl', processors='tokenize,ner')(text)
+        corg, persons = PDFInformationExtractor.collect_entities(doc)
+        self.assertEqual(dict(corg), dict(zip(*np.unique([ent.text for ent in doc.ents if ent.type == "ORG"],
+                                                         return_counts=True))))
+        np.testing.assert_array_equal(persons, np.unique([ent.text for ent in doc.ents if ent.type == "PER"]))
+
     def test_ots(self):
         r"""Unit test function for the 'ots' method.
 
@@ -231,6 +298,19 @@ class TestReadPDF(unittest.TestCase):
         """
         self.assertTrue(os.path.exists(PDFInformationExtractor.download_stanza_NL()))
 
+    def test_load_pipeline(self):
+        """Unit test function for the 'load_pipeline' function.
+
+        This function tests that 'load_pipeline' returns a stanza pipeline, and that the same pipeline is returned
+        when it is called again.
+
+        Raises:
+            AssertionError: If any of the assert statements fail, indicating incorrect return values.
+        """
+        nlp = PDFInformationExtractor.load_pipeline()
+        self.assertTrue(isinstance(nlp, stanza.Pipeline))
+        self.assertIs(PDFInformationExtractor.load_pipeline(), nlp)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,16 @@
 """Tests for run_nedextract."""
 import glob
+import logging
 import numpy as np
 import os
 from os.path import exists
 import pandas as pd
+import tempfile
 import time
 import unittest
+from unittest import mock
+from nedextract.run_nedextract import configure_logging
+from nedextract.run_nedextract import configure_package_logging
 from nedextract.run_nedextract import run
 from nedextract.run_nedextract import output_to_df
 from nedextract.run_nedextract import write_output
@@ -18,6 +23,15 @@ infile1 = os.path.join(indir, file)
 url = 'https://github.com/Transparency-in-the-non-profit-sector/nedextract/blob/main/tests/test_report.pdf'
 
 
+def logging_handlers(logger: logging.Logger):
+    """Return the handlers that show the messages of a logger, other than NullHandlers."""
+    handlers = []
+    while logger:
+        handlers.extend(handler for handler in logger.handlers if not isinstance(handler, logging.NullHandler))
+        logger = logger.parent if logger.propagate else None
+    return handlers
+
+
 # Expected dataframe for the test case of a sector task
 e_df_g = pd.DataFrame({'Input_file': [file], 'Organization': ['Bedrijf'], 'Main_sector': ['Natuur en milieu']})
 
@@ -27,9 +41,11 @@ class TestRunAutoExtract(unittest.TestCase):
 
     Test_methods:
         - test_run: tests the run function tha runs the full pipeline of nedextract.
+        - test_run_urlf: tests the run function with a txt file containing urls.
         - test_output to df: tests the output_to_df function that converts numpy arrays
         to pandas dataframes with correct column names.
         - test_write_output
+        - test_configure_package_logging: tests that the progress is shown when logging is not configured.
     """
 
     def test_run(self):
@@ -38,9 +54,11 @@ class TestRunAutoExtract(unittest.TestCase):
 
         This function tests the run function tha runs the full pipeline of nedextract.
 
-        It checks two scenarios:
+        It checks three scenarios:
         1. Testing with a file argument, using test file: tests/test_report.pdf
         2. Testing with a directory argument, using test directory: tests
+        3. Testing with a directory argument and two worker processes, which should give the same output as 2, and
+           should show each log message once.
 
         Raises:
             AssertionError: If any of the assert statements fail, indicating incorrect return values.
@@ -53,6 +71,40 @@ class TestRunAutoExtract(unittest.TestCase):
         df1, _, _ = run(directory=indir)
         self.assertTrue(isinstance(df1, pd.DataFrame))
 
+        # Test case 3, without logging configured by the caller. A forked worker process inherits the handler added
+        # to the 'nedextract' logger and configures logging itself, after which each message is still shown once.
+        package_logger = logging.getLogger('nedextract')
+        handlers, level, propagate = list(package_logger.handlers), package_logger.level, package_logger.propagate
+        try:
+            with mock.patch.object(logging.getLogger(), 'handlers', []):
+                df2, _, _ = run(directory=indir, write_o=False, workers=2)
+                configure_logging(package_logger.getEffectiveLevel())
+                self.assertEqual(len(logging_handlers(logging.getLogger('nedextract.read_pdf'))), 1)
+        finally:
+            package_logger.handlers, package_logger.level, package_logger.propagate = handlers, level, propagate
+        pd.testing.assert_frame_equal(df1, df2)
+
+    def test_run_urlf(self):
+        """
+        Unit test function for the 'run' function with the 'urlf' argument.
+
+        The downloading is mocked and returns the test file: tests/test_report.pdf. The test checks that each url in
+        a txt file with two urls and a blank line is downloaded without its line ending, and that both files are
+        processed.
+
+        Raises:
+            AssertionError: If any of the assert statements fail, indicating incorrect return values.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            urlf = os.path.join(tmpdir, 'urls.txt')
+            with open(urlf, mode='w', encoding='UTF-8') as u_url:
+                u_url.write(url + '\n' + url + '2\n\n')
+            with mock.patch('nedextract.run_nedextract.download_pdf', return_value=infile1) as download:
+                with mock.patch('nedextract.run_nedextract.delete_downloaded_pdf'):
+                    df1, _, _ = run(urlf=urlf, write_o=False)
+        self.assertEqual(download.call_args_list, [mock.call(url), mock.call(url + '2')])
+        self.assertEqual(len(df1), 2)
+
     def test_output_to_df(self):
         """
         Unit test function for the 'output_to_df' function.
@@ -97,6 +149,28 @@ class TestRunAutoExtract(unittest.TestCase):
         # remove created file
         os.remove(glob.glob(writefile)[0])
 
+    def test_configure_package_logging(self):
+        """Unit test for the configure_package_logging function.
+
+        A handler is added to the 'nedextract' logger if logging is not configured, and only once. No handler is added
+        if the root logger has a handler.
+        """
+        package_logger = logging.getLogger('nedextract')
+        handlers, level, propagate = list(package_logger.handlers), package_logger.level, package_logger.propagate
+        try:
+            with mock.patch.object(logging.getLogger(), 'handlers', []):
+                configure_package_logging()
+                configure_package_logging()
+            self.assertEqual(len(package_logger.handlers), len(handlers) + 1)
+            self.assertEqual(package_logger.level, logging.INFO)
+            self.assertFalse(package_logger.propagate)
+        finally:
+            package_logger.handlers, package_logger.level, package_logger.propagate = handlers, level, propagate
+
+        with mock.patch.object(logging.getLogger(), 'handlers', [logging.NullHandler()]):
+            configure_package_logging()
+        self.assertEqual(package_logger.handlers, handlers)
+
 
 if __name__ == '__main__':
     unittest.main()
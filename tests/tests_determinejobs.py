@@ -66,7 +66,7 @@ class TestsDetermineJobs(unittest.TestCase):
         serach words the occurences for each of them in a text and the number of sentences that
         contain any of the search words.
 
-        There are three test cases, each with different test texts and different search words
+        There are four test cases, each with different test texts and different search words
 
         Raises:
             AssertionError: If the return values do not match the expected return values.
@@ -93,6 +93,14 @@ class TestsDetermineJobs(unittest.TestCase):
         self.assertEqual(totalcount, 1)
         self.assertEqual(totalcount_sentence, 1)
 
+        # Test case 4: search words are only counted as whole words
+        text = np.array(['de bedrijfsdirecteur en de directeuren.',
+                         'directeur-bestuurder jane doe'])
+        search_words = ['directeur']
+        totalcount, totalcount_sentence = DetermineJobs.count_occurrence(text, search_words)
+        self.assertEqual(totalcount, 1)
+        self.assertEqual(totalcount_sentence, 1)
+
     def test_determine_main_job(self):
         """Unit test for the 'determine_main_job' function.
 
@@ -2,12 +2,16 @@
 
 Functions:
 - test_keyword_check
+- test_cached_keyword_check
 - test_check_single_orgs
 - test_part_of_other
+- test_count_word_mentions
 - test_individual_org_check
+- test_bulk_ner_orgs
 - test_pco
 - test_strip_function_of_entity
 - test_count_number_of_mentions
+- test_count_all_mentions
 """
 import os
 import unittest
@@ -31,18 +35,24 @@ class TestsOrgs_Checks(unittest.TestCase):
     Test methods:
     - test_keyword_check: tests the keyword_check function that determines if an org is likely to be or not be an organisation
       based on keywords
+    - test_cached_keyword_check: tests the cached_keyword_check function that applies and caches keyword_check for an org
     - test_check_single_orgs: tests the check_single_orgs function that appends an org to an input list if it
       passes the keyword check and is not part of other org
     - test_part_of_other: tests the function part_of_other that checks if a member of
       orgs is part of the org string.
+    - test_count_word_mentions: tests the function count_word_mentions that counts the mentions of an org as a whole
+      word in a text
     - test_individual_org_check: tests the individual_org_check that checks if an potential ORG is considered and ORG
       if just that name is analysed by Stanza NER.
+    - test_bulk_ner_orgs: tests the bulk_ner_orgs function that applies NER to multiple potential ORGs at once
     - test_pco: tests the percentage_consired_org function that identifies the percentage of cases for which
       a an organisation was identified by NER as organisation within the text
     - test_strip_function_of_entity: tests the strip_function_of_entity function that removes any persons work role
       of the name of a potential org.
     - test_count_number_of_mentions: Tests the count_number_of_mentions function that the number of mentions of org in the text,
       taking into account word boundaries
+    - test_count_all_mentions: Tests the count_all_mentions function that counts the number of mentions of multiple orgs
+      in the text at once
     """
 
     def test_keyword_check(self):
@@ -76,6 +86,20 @@ class TestsOrgs_Checks(unittest.TestCase):
         kwc = extraction.keyword_check()
         self.assertFalse(kwc)
 
+    def test_cached_keyword_check(self):
+        """Unit test function for the cached_keyword_check function.
+
+        This function tests that cached_keyword_check gives the same result as keyword_check without an initial
+        decision status, also when the result is taken from the cache.
+
+        Raises:
+            AssertionError: If any of the assert statements fail, indicating incorrect return values.
+        """
+        for org in ['Huppeldepup B.V', 'Ministerie', 'Hogeschool', 'Huppeldepup']:
+            kwc = OrganisationExtraction().keyword_check(final=False, org=org)
+            self.assertEqual(OrganisationExtraction.cached_keyword_check(org), kwc)
+            self.assertEqual(OrganisationExtraction.cached_keyword_check(org), kwc)
+
     def test_check_single_orgs(self):
         """Unit tes for the function check_single_orgs.
 
@@ -106,6 +130,24 @@ class TestsOrgs_Checks(unittest.TestCase):
         is_part = OrganisationExtraction().part_of_other(orgs=[orgs], org=org, doc=doc)
         self.assertTrue(is_part)
 
+    def test_count_word_mentions(self):
+        """Unit test for the function count_word_mentions.
+
+        This function tests the function count_word_mentions that counts the number of mentions of an org as a whole
+        word in a text. Contains two test cases, for different orgs in the same short text, and checks that the cache is
+        emptied by clear_document_caches.
+
+        Raises:
+            AssertionError: If any of the assert statements fails, indicating an incorrect return value.
+        """
+        text_b = 'Bedrijf, Bedrijfje en Bedrijf-x'
+        self.assertEqual(OrganisationExtraction.count_word_mentions('Bedrijf', text_b), 2)
+        self.assertEqual(OrganisationExtraction.count_word_mentions('Bedrijfje', text_b), 1)
+
+        # the cached counts are not kept once the document is done
+        OrganisationExtraction.clear_document_caches()
+        self.assertEqual(OrganisationExtraction.count_word_mentions.cache_info().currsize, 0)
+
     def test_individual_org_check(self):
         """Unit test for the function individual_org_check.
 
@@ -119,6 +161,22 @@ class TestsOrgs_Checks(unittest.TestCase):
         is_org = OrganisationExtraction(org=org, nlp=nlp).individual_org_check()
         self.assertTrue(is_org)
 
+    def test_bulk_ner_orgs(self):
+        """Unit test for the function bulk_ner_orgs.
+
+        This function tests the bulk_ner_orgs function that applies Stanza NER to multiple potential ORGs in one
+        batch and caches the results for ner_orgs. Contains one test case.
+
+        Raises:
+            AssertionError: If the assert statement fails, indicating an incorrect return value.
+        """
+        orgs = ['Stichting Huppeldepup', 'Bedrijf bla']
+        OrganisationExtraction.bulk_ner_orgs(nlp, orgs)
+        for org in orgs:
+            doc_o = nlp(org)
+            e_o_t = tuple(ent.text for ent in doc_o.ents if ent.type == "ORG")
+            self.assertEqual(OrganisationExtraction.ner_orgs(nlp, org), e_o_t)
+
     def test_pco(self):
         """Unit test for the percentage_considered_org function.
 
@@ -182,3 +240,18 @@ class TestsOrgs_Checks(unittest.TestCase):
         extraction.org = 'Bedrijf-'
         n = extraction.count_number_of_mentions()
         self.assertEqual(n, 0)
+
+    def test_count_all_mentions(self):
+        """Unit test for the count_all_mentions.
+
+        Tests the count_all_mentions function that counts the number of mentions of multiple orgs in the text at once.
+        Contains one test case, with the orgs of the test cases of test_count_number_of_mentions and an org containing
+        a regex special character, applied to the test doc.
+
+        Raises:
+            AssertionError: If the return value does not match the counts of count_number_of_mentions.
+        """
+        orgs = ['Bedrijf', 'Bedrijf-', 'B1 b.v.']
+        n = OrganisationExtraction.count_all_mentions(orgs, doc)
+        self.assertEqual(n, [OrganisationExtraction(doc=doc).count_number_of_mentions(org=org) for org in orgs])
+        self.assertEqual(n[:2], [7, 0])